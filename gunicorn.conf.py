@@ -0,0 +1,36 @@
+# Production server configuration, used as `gunicorn project.server:app -c gunicorn.conf.py`.
+# Every setting can be overridden with the environment variable named next to it.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Import the app, and preload models, once in the master so workers share them.
+preload_app = True
+
+# Recycle workers after a bounded number of requests to cap memory growth; the jitter
+# keeps all workers from restarting at the same time.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before any worker is forked.
+    import project.preload
+
+    project.preload.preload_models()
+
+
+def post_fork(server, worker):
+    # The Prisma client connects in the app lifespan, which runs inside each worker after
+    # the fork, so no database connection is ever shared across processes.
+    server.log.info("Worker %s spawned", worker.pid)
@@ -0,0 +1,344 @@
+import json
+import struct
+import zlib
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import prisma
+import prisma.enums
+import prisma.fields
+import prisma.models
+import project.engagement_patterns_service
+from fastapi.concurrency import run_in_threadpool
+from project.sketches import CountMinSketch, HyperLogLog, top_k
+
+SKETCH_VERSION = 1
+TOP_USERS_PER_DAY = 50
+MAX_DAYS_BUILT_PER_QUERY = 2
+
+
+class DailySketch:
+    """
+    Compact summary of one day of UserModuleInteraction rows for users of one role.
+
+    Holds exact interaction counts per module, a HyperLogLog of distinct users per module, and
+    a count-min sketch of interactions per user together with the day's heaviest users as top-k
+    candidates. Merging is vectorized, so merging a year of sketches takes milliseconds.
+    """
+
+    def __init__(self) -> None:
+        self.module_counts: Counter = Counter()
+        self.distinct_users: Dict[str, HyperLogLog] = {}
+        self.user_counts = CountMinSketch()
+        self.top_users: Dict[str, int] = {}
+
+    def add(self, user_id: str, module_name: str, count: int = 1) -> None:
+        self.module_counts[module_name] += count
+        self.distinct_users.setdefault(module_name, HyperLogLog()).add(user_id)
+        self.user_counts.add(user_id, count)
+
+    def merge(self, other: "DailySketch") -> None:
+        self.module_counts.update(other.module_counts)
+        for module_name, sketch in other.distinct_users.items():
+            self.distinct_users.setdefault(module_name, HyperLogLog()).merge(sketch)
+        self.user_counts.merge(other.user_counts)
+        # Candidates are ranked by their summed daily top-k counts here, and by their count-min
+        # estimate only once the merge is complete (see top_k).
+        candidates = Counter(self.top_users)
+        candidates.update(other.top_users)
+        self.top_users = dict(candidates.most_common(TOP_USERS_PER_DAY))
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the sketch as a zlib compressed JSON header followed by the raw sketches.
+        """
+        modules = sorted(self.distinct_users)
+        header = json.dumps(
+            {
+                "version": SKETCH_VERSION,
+                "module_counts": self.module_counts,
+                "modules": modules,
+                "cms": [
+                    self.user_counts.width,
+                    self.user_counts.depth,
+                    self.user_counts.total,
+                ],
+                "top_users": self.top_users,
+            }
+        ).encode()
+        body = b"".join(self.distinct_users[module].to_bytes() for module in modules)
+        return zlib.compress(
+            struct.pack(">I", len(header)) + header + body + self.user_counts.to_bytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DailySketch":
+        raw = zlib.decompress(data)
+        (header_length,) = struct.unpack(">I", raw[:4])
+        header = json.loads(raw[4 : 4 + header_length])
+        if header["version"] != SKETCH_VERSION:
+            raise ValueError(f"Unsupported sketch version {header['version']}")
+        sketch = cls()
+        sketch.module_counts = Counter(header["module_counts"])
+        offset = 4 + header_length
+        register_count = len(HyperLogLog().registers)
+        for module in header["modules"]:
+            sketch.distinct_users[module] = HyperLogLog(
+                registers=raw[offset : offset + register_count]
+            )
+            offset += register_count
+        width, depth, total = header["cms"]
+        sketch.user_counts = CountMinSketch(width, depth, total, raw[offset:])
+        sketch.top_users = header["top_users"]
+        return sketch
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _utc_timestamp(value: datetime) -> str:
+    """
+    Formats a datetime as a UTC timestamp literal, treating naive datetimes as UTC like Prisma does.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+async def build_daily_sketches(day: date) -> Dict[str, DailySketch]:
+    """
+    Builds one DailySketch per user role from the interactions of a single UTC day.
+
+    The interactions are aggregated per (role, user, module) in the database, so only one row
+    per active user and module is transferred and memory use is bounded by the day's activity.
+
+    Args:
+        day (date): The UTC day to summarize.
+
+    Returns:
+        Dict[str, DailySketch]: Sketches keyed by UserRole; roles without interactions are omitted.
+    """
+    start = _midnight(day)
+    rows = await prisma.get_client().query_raw(
+        """
+        SELECT u."role"::text AS role, i."userId" AS user_id,
+               i."moduleName"::text AS module_name, COUNT(*)::int AS interaction_count
+        FROM "UserModuleInteraction" i
+        JOIN "User" u ON u."id" = i."userId"
+        WHERE i."interactionAt" >= $1::timestamp AND i."interactionAt" < $2::timestamp
+        GROUP BY u."role", i."userId", i."moduleName"
+        """,
+        _utc_timestamp(start),
+        _utc_timestamp(start + timedelta(days=1)),
+    )
+    sketches: Dict[str, DailySketch] = {}
+    user_totals: Dict[str, Counter] = {}
+    for row in rows:
+        role = row["role"]
+        sketches.setdefault(role, DailySketch()).add(
+            row["user_id"], row["module_name"], row["interaction_count"]
+        )
+        user_totals.setdefault(role, Counter())[row["user_id"]] += row[
+            "interaction_count"
+        ]
+    for role, sketch in sketches.items():
+        sketch.top_users = dict(user_totals[role].most_common(TOP_USERS_PER_DAY))
+    return sketches
+
+
+async def earliest_interaction_day() -> Optional[date]:
+    """
+    Returns the UTC day of the oldest interaction, or None when there are none.
+    """
+    first = await prisma.models.UserModuleInteraction.prisma().find_first(
+        order={"interactionAt": "asc"}
+    )
+    return first.interactionAt.date() if first else None
+
+
+async def build_missing_sketches(
+    first_day: Optional[date] = None, last_day: Optional[date] = None
+) -> int:
+    """
+    Builds and stores the sketches of every completed day that does not have them yet.
+
+    Meant to run once a day, e.g. `python -m project.build_sketches` from a scheduler, so that
+    approximate queries only have to read stored sketches.
+
+    Args:
+        first_day (Optional[date]): First day to consider; defaults to the day of the oldest interaction.
+        last_day (Optional[date]): Last day to consider; defaults to yesterday (UTC).
+
+    Returns:
+        int: Number of days built.
+    """
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+    last_day = min(last_day or yesterday, yesterday)
+    earliest = await earliest_interaction_day()
+    if earliest is None:
+        return 0
+    first_day = max(first_day or earliest, earliest)
+    stored = await _stored_days(first_day, last_day)
+    built = 0
+    day = first_day
+    while day <= last_day:
+        if day not in stored:
+            await _persist(day, await build_daily_sketches(day))
+            built += 1
+        day += timedelta(days=1)
+    return built
+
+
+async def _stored_days(first_day: date, last_day: date) -> Dict[date, Dict[str, Any]]:
+    stored = await prisma.models.EngagementSketch.prisma().find_many(
+        where={"day": {"gte": _midnight(first_day), "lte": _midnight(last_day)}}
+    )
+    by_day: Dict[date, Dict[str, Any]] = {}
+    for record in stored:
+        by_day.setdefault(record.day.date(), {})[record.role.value] = record
+    return by_day
+
+
+async def load_merged_sketch(
+    start_date: datetime, end_date: datetime, segment: Optional[str] = None
+) -> Tuple[DailySketch, List[date]]:
+    """
+    Merges the daily sketches of every UTC day overlapping the given range.
+
+    The range is clamped to the day of the oldest interaction. Sketches of completed days are
+    read from the EngagementSketch table, which build_missing_sketches fills ahead of time; up to
+    MAX_DAYS_BUILT_PER_QUERY missing days (such as yesterday, before the daily build has run) are
+    built and stored on the request path, any further missing days are left out. The current day
+    is always built from the interaction table and never stored. Stored sketches are decoded and
+    merged in a worker thread, so long ranges do not block the event loop.
+
+    Args:
+        start_date (datetime): Start of the range; the whole first day is included.
+        end_date (datetime): End of the range; the whole last day is included.
+        segment (Optional[str]): Only merge the sketches of users with this role.
+
+    Returns:
+        Tuple[DailySketch, List[date]]: A single sketch covering the range, and the days left out.
+    """
+    today = datetime.now(timezone.utc).date()
+    earliest = await earliest_interaction_day()
+    if earliest is None:
+        return DailySketch(), []
+    first_day = max(start_date.date(), earliest)
+    last_day = min(end_date.date(), today)
+    stored = await _stored_days(first_day, last_day)
+    missing: List[date] = []
+    encoded: List[bytes] = []
+    fresh: List[DailySketch] = []
+    built = 0
+    day = last_day
+    # Walk backwards so that the most recent missing days are the ones built.
+    while day >= first_day:
+        if day in stored:
+            encoded.extend(
+                record.data.decode()
+                for role, record in stored[day].items()
+                if not segment or role == segment
+            )
+        else:
+            by_role: Dict[str, DailySketch] = {}
+            if day == today:
+                by_role = await build_daily_sketches(day)
+            elif built < MAX_DAYS_BUILT_PER_QUERY:
+                by_role = await build_daily_sketches(day)
+                await _persist(day, by_role)
+                built += 1
+            else:
+                missing.append(day)
+            fresh.extend(
+                sketch
+                for role, sketch in by_role.items()
+                if not segment or role == segment
+            )
+        day -= timedelta(days=1)
+    merged = await run_in_threadpool(_merge, encoded, fresh)
+    return merged, sorted(missing)
+
+
+def _merge(encoded: List[bytes], sketches: List[DailySketch]) -> DailySketch:
+    merged = DailySketch()
+    for data in encoded:
+        merged.merge(DailySketch.from_bytes(data))
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
+
+
+async def _persist(day: date, by_role: Dict[str, DailySketch]) -> None:
+    # Every role gets a row, even if empty, so that quiet days are not rebuilt on each query.
+    for role in prisma.enums.UserRole:
+        data = prisma.fields.Base64.encode(
+            by_role.get(role.value, DailySketch()).to_bytes()
+        )
+        await prisma.models.EngagementSketch.prisma().upsert(
+            where={"day_role": {"day": _midnight(day), "role": role}},
+            data={
+                "create": {
+                    "day": _midnight(day),
+                    "role": role,
+                    "data": data,
+                },
+                "update": {"data": data},
+            },
+        )
+
+
+def _error_bounds(sketch: DailySketch, missing_days: List[date]) -> Dict[str, Any]:
+    return {
+        "count_overestimate_at_most": round(sketch.user_counts.error_bound(), 2),
+        "count_confidence": round(sketch.user_counts.confidence, 4),
+        "distinct_users_relative_std_error": round(HyperLogLog().relative_error, 4),
+        "days_without_sketch": [day.isoformat() for day in missing_days],
+    }
+
+
+async def approximate_engagement_patterns(
+    start_date: datetime, end_date: datetime, segment: Optional[str] = None
+) -> project.engagement_patterns_service.EngagementPatternsResponse:
+    """
+    Analyzes engagement patterns from merged daily sketches instead of raw interactions.
+
+    Interaction counts per module are exact; distinct users per module are HyperLogLog estimates
+    and the heaviest users are count-min estimates, with their error bounds in the response.
+    The range is widened to whole UTC days; days whose sketches are not built yet are listed
+    in the error bounds.
+
+    Args:
+        start_date (datetime): Start date for the period to analyze engagement patterns.
+        end_date (datetime): End date for the period to analyze engagement patterns.
+        segment (Optional[str]): Optional user role to filter the analysis.
+
+    Returns:
+        EngagementPatternsResponse: Provides summarized data and insights into user engagement patterns within the specified period.
+    """
+    sketch, missing_days = await load_merged_sketch(start_date, end_date, segment)
+    distinct_users = HyperLogLog()
+    for module_sketch in sketch.distinct_users.values():
+        distinct_users.merge(module_sketch)
+    details = {
+        "total_interactions": sum(sketch.module_counts.values()),
+        "interactions_by_module": dict(sketch.module_counts),
+        "distinct_users": distinct_users.estimate(),
+        "distinct_users_by_module": {
+            module_name: module_sketch.estimate()
+            for module_name, module_sketch in sketch.distinct_users.items()
+        },
+        "top_users": top_k(sketch.user_counts, sketch.top_users, 10),
+    }
+    return project.engagement_patterns_service.EngagementPatternsResponse(
+        overview="Approximate engagement analysis for the selected period.",
+        details=details,
+        recommendations=[
+            "Review modules with lower engagement for potential UX improvements.",
+            "Consider additional features for modules with high engagement.",
+        ],
+        approximate=True,
+        error_bounds=_error_bounds(sketch, missing_days),
+    )
@@ -0,0 +1,44 @@
+"""
+Builds the approximate-analytics sketches of every completed day that does not have them yet.
+
+Usage:
+    python -m project.build_sketches [--since 2024-01-01]
+
+Run it once a day (e.g. shortly after midnight UTC) so that `approx=true` queries only read
+stored sketches instead of building them on the request path.
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import date
+
+import project.approximate_analytics_service
+from prisma import Prisma
+
+
+async def build(since: date | None) -> int:
+    db_client = Prisma(auto_register=True)
+    await db_client.connect()
+    try:
+        return await project.approximate_analytics_service.build_missing_sketches(since)
+    finally:
+        await db_client.disconnect()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--since",
+        type=date.fromisoformat,
+        default=None,
+        help="First day to build, as YYYY-MM-DD; defaults to the day of the oldest interaction.",
+    )
+    args = parser.parse_args()
+    built = asyncio.run(build(args.since))
+    print(f"Built sketches for {built} day(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
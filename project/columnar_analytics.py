@@ -0,0 +1,456 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import prisma
+import prisma.enums
+import project.config
+
+MODULE_NAMES: Tuple[str, ...] = tuple(
+    module.value for module in prisma.enums.ModuleName
+)
+MODULE_CODES: Dict[str, int] = {name: code for code, name in enumerate(MODULE_NAMES)}
+ROLE_NAMES: Tuple[str, ...] = tuple(role.value for role in prisma.enums.UserRole)
+ROLE_CODES: Dict[str, int] = {name: code for code, name in enumerate(ROLE_NAMES)}
+NO_ROLE = -1
+
+MS_PER_HOUR = 3_600_000
+MS_PER_DAY = 86_400_000
+
+# Rows committed slightly out of order can land behind the refresh cursor; each refresh re-reads
+# this much history and skips the ids it has already seen.
+LATE_ROW_TOLERANCE_MS = 10_000
+
+
+def epoch_ms(value: datetime) -> int:
+    """
+    Converts a datetime to epoch milliseconds, treating naive datetimes as UTC like Prisma does.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+@dataclass(frozen=True)
+class InteractionFrame:
+    """
+    A selection of interactions as three parallel arrays, with vectorized aggregations over them.
+    """
+
+    users: np.ndarray
+    modules: np.ndarray
+    timestamps: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def module_counts(self) -> Dict[str, int]:
+        """
+        Number of interactions per ModuleName, omitting modules without interactions.
+        """
+        counts = np.bincount(self.modules, minlength=len(MODULE_NAMES))
+        return {
+            MODULE_NAMES[code]: int(count) for code, count in enumerate(counts) if count
+        }
+
+    def top_modules(self, k: int) -> List[str]:
+        """
+        The k most used ModuleNames, most used first; ties keep ModuleName order.
+        """
+        counts = np.bincount(self.modules, minlength=len(MODULE_NAMES))
+        order = np.argsort(-counts, kind="stable")[:k]
+        return [MODULE_NAMES[code] for code in order if counts[code]]
+
+    def hour_histogram(self) -> np.ndarray:
+        """
+        Number of interactions in each UTC hour of the day, as an array of 24 counts.
+        """
+        return np.bincount((self.timestamps // MS_PER_HOUR) % 24, minlength=24)
+
+
+class InteractionColumns:
+    """
+    Holds UserModuleInteraction rows as compact NumPy columns, sorted by timestamp.
+
+    User ids are dictionary-encoded into int32 codes, module names into int8 codes and
+    interaction times are stored as int64 epoch milliseconds, so a row takes 13 bytes instead of
+    a full model object. Columns grow geometrically, making appends amortized O(rows appended),
+    and because rows stay sorted a time window is a contiguous slice found by binary search.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.size = 0
+        self.user_ids: List[str] = []
+        self.user_codes: Dict[str, int] = {}
+        self.user_roles = np.full(capacity, NO_ROLE, dtype=np.int8)
+        self._users = np.empty(capacity, dtype=np.int32)
+        self._modules = np.empty(capacity, dtype=np.int8)
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+
+    @property
+    def users(self) -> np.ndarray:
+        return self._users[: self.size]
+
+    @property
+    def modules(self) -> np.ndarray:
+        return self._modules[: self.size]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[: self.size]
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self._users.nbytes
+            + self._modules.nbytes
+            + self._timestamps.nbytes
+            + self.user_roles.nbytes
+        )
+
+    def _grow(self, array: np.ndarray, required: int, fill: int = 0) -> np.ndarray:
+        if required <= len(array):
+            return array
+        grown = np.full(max(required, 2 * len(array)), fill, dtype=array.dtype)
+        grown[: len(array)] = array
+        return grown
+
+    def encode_user(self, user_id: str) -> int:
+        code = self.user_codes.get(user_id)
+        if code is None:
+            code = self.user_codes[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+            self.user_roles = self._grow(self.user_roles, code + 1, NO_ROLE)
+        return code
+
+    def set_roles(self, user_ids: Iterable[str], roles: Iterable[str]) -> None:
+        for user_id, role in zip(user_ids, roles):
+            code = self.encode_user(user_id)
+            self.user_roles[code] = ROLE_CODES[role]
+
+    def encode(
+        self,
+        user_ids: Sequence[str],
+        module_names: Sequence[str],
+        timestamps: Sequence[int],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Encodes rows into column arrays without storing them, e.g. to insert them later at once.
+
+        Args:
+            user_ids (Sequence[str]): The userId of each row.
+            module_names (Sequence[str]): The ModuleName of each row.
+            timestamps (Sequence[int]): The interactionAt of each row, in epoch milliseconds.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: User codes, module codes and timestamps.
+        """
+        count = len(timestamps)
+        users = np.fromiter(
+            (self.encode_user(user_id) for user_id in user_ids), np.int32, count
+        )
+        modules = np.fromiter(
+            (MODULE_CODES[name] for name in module_names), np.int8, count
+        )
+        return users, modules, np.asarray(timestamps, dtype=np.int64)
+
+    def append(
+        self,
+        user_ids: Sequence[str],
+        module_names: Sequence[str],
+        timestamps: Sequence[int],
+    ) -> None:
+        """
+        Encodes and inserts rows, see `insert`.
+        """
+        if len(timestamps):
+            self.insert(*self.encode(user_ids, module_names, timestamps))
+
+    def insert(
+        self, users: np.ndarray, modules: np.ndarray, timestamps: np.ndarray
+    ) -> None:
+        """
+        Stores encoded rows, keeping all rows sorted by timestamp.
+
+        Rows at or after the newest stored row are appended in amortized O(rows inserted). Older
+        rows are merged in with one binary search per row and a single O(rows stored) copy, so a
+        backfill should be inserted at once rather than page by page.
+
+        Args:
+            users (np.ndarray): User codes from `encode`.
+            modules (np.ndarray): Module codes from `encode`.
+            timestamps (np.ndarray): Timestamps in epoch milliseconds.
+        """
+        count = len(timestamps)
+        if not count:
+            return
+        if np.any(np.diff(timestamps) < 0):
+            order = np.argsort(timestamps, kind="stable")
+            users, modules, timestamps = users[order], modules[order], timestamps[order]
+        if self.size and timestamps[0] < self._timestamps[self.size - 1]:
+            # Equal timestamps keep stored rows first, like the stable sort used to.
+            positions = np.searchsorted(self.timestamps, timestamps, side="right")
+            self._users = np.insert(self.users, positions, users)
+            self._modules = np.insert(self.modules, positions, modules)
+            self._timestamps = np.insert(self.timestamps, positions, timestamps)
+            self.size += count
+            return
+        required = self.size + count
+        self._users = self._grow(self._users, required)
+        self._modules = self._grow(self._modules, required)
+        self._timestamps = self._grow(self._timestamps, required)
+        self._users[self.size : required] = users
+        self._modules[self.size : required] = modules
+        self._timestamps[self.size : required] = timestamps
+        self.size = required
+
+    def evict_before(self, ms: int) -> None:
+        """
+        Drops the rows with a timestamp before ms, keeping the remaining rows in place.
+        """
+        lower = int(np.searchsorted(self.timestamps, ms, side="left"))
+        if not lower:
+            return
+        remaining = self.size - lower
+        self._users[:remaining] = self._users[lower : self.size]
+        self._modules[:remaining] = self._modules[lower : self.size]
+        self._timestamps[:remaining] = self._timestamps[lower : self.size]
+        self.size = remaining
+
+    def select(
+        self,
+        start_ms: int,
+        end_ms: int,
+        user_id: Optional[str] = None,
+        role: Optional[str] = None,
+        module_names: Optional[Iterable[str]] = None,
+    ) -> InteractionFrame:
+        """
+        Selects the rows with start_ms <= timestamp <= end_ms matching the optional filters.
+
+        Args:
+            start_ms (int): Start of the window in epoch milliseconds, inclusive.
+            end_ms (int): End of the window in epoch milliseconds, inclusive.
+            user_id (Optional[str]): Keep only the rows of this user.
+            role (Optional[str]): Keep only the rows of users with this UserRole.
+            module_names (Optional[Iterable[str]]): Keep only the rows of these modules.
+
+        Returns:
+            InteractionFrame: The selected rows. Without filters the arrays are views, not copies.
+
+        Raises:
+            ValueError: If the role or a module name is unknown.
+        """
+        lower = int(np.searchsorted(self.timestamps, start_ms, side="left"))
+        upper = int(np.searchsorted(self.timestamps, end_ms, side="right"))
+        users = self._users[lower:upper]
+        modules = self._modules[lower:upper]
+        timestamps = self._timestamps[lower:upper]
+        mask: Optional[np.ndarray] = None
+        if user_id is not None:
+            code = self.user_codes.get(user_id)
+            mask = users == (-1 if code is None else code)
+        if role is not None:
+            if role not in ROLE_CODES:
+                raise ValueError(
+                    f"Unknown segment '{role}'; expected one of {list(ROLE_NAMES)}"
+                )
+            matches = self.user_roles[users] == ROLE_CODES[role]
+            mask = matches if mask is None else mask & matches
+        if module_names is not None:
+            codes = [MODULE_CODES[name] for name in module_names]
+            matches = np.isin(modules, codes)
+            mask = matches if mask is None else mask & matches
+        if mask is not None:
+            users, modules, timestamps = users[mask], modules[mask], timestamps[mask]
+        return InteractionFrame(users=users, modules=modules, timestamps=timestamps)
+
+
+class InteractionStore:
+    """
+    Keeps the UserModuleInteraction table mirrored in InteractionColumns for the current process.
+
+    Rows are loaded on demand: the first query loads its window, a query reaching further back
+    loads the missing history, and at most every `refresh_seconds` new rows and changed user
+    roles are fetched incrementally. Rows are read with keyset pagination over raw SQL, so no
+    model objects are built while loading.
+
+    Only the last `retention_days` of interactions are held; older rows are evicted on refresh
+    and queries starting before that must be answered from the database (see `covers`).
+    """
+
+    def __init__(
+        self, refresh_seconds: float, retention_days: float, page_size: int = 50_000
+    ) -> None:
+        self.refresh_seconds = refresh_seconds
+        self.retention_days = retention_days
+        self.page_size = page_size
+        self.loaded_from_ms: Optional[int] = None
+        self._clear()
+        self.roles_checked_ms = 0
+        self.refreshed_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def _clear(self) -> None:
+        self.columns = InteractionColumns()
+        self.newest_ms = 0
+        self.recent_ids: Dict[str, int] = {}
+
+    def horizon_ms(self) -> int:
+        """
+        Oldest interaction time held in memory, in epoch milliseconds.
+        """
+        return int(time.time() * 1000) - int(self.retention_days * MS_PER_DAY)
+
+    def covers(self, start_date: datetime) -> bool:
+        """
+        Whether a window starting at start_date lies within the retention of the store.
+        """
+        return epoch_ms(start_date) >= self.horizon_ms()
+
+    async def _fetch(
+        self, after: Tuple[int, str], before_ms: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        before = (
+            "AND i.\"interactionAt\" < TIMESTAMP 'epoch' + $4::bigint * INTERVAL '1 millisecond'"
+            if before_ms is not None
+            else ""
+        )
+        return await prisma.get_client().query_raw(
+            f"""
+            SELECT i."id" AS id, i."userId" AS user_id, i."moduleName"::text AS module_name,
+                   (EXTRACT(EPOCH FROM i."interactionAt") * 1000)::bigint AS interaction_ms,
+                   u."role"::text AS role
+            FROM "UserModuleInteraction" i
+            JOIN "User" u ON u."id" = i."userId"
+            WHERE (i."interactionAt", i."id")
+                  > (TIMESTAMP 'epoch' + $1::bigint * INTERVAL '1 millisecond', $2) {before}
+            ORDER BY i."interactionAt", i."id"
+            LIMIT $3
+            """,
+            *after,
+            self.page_size,
+            *(() if before_ms is None else (before_ms,)),
+        )
+
+    async def _load(self, from_ms: int, before_ms: Optional[int] = None) -> None:
+        # Loads every row with from_ms <= interactionAt (< before_ms). Rows read without an upper
+        # bound advance newest_ms, and the ids of the newest ones are kept to skip them when a
+        # refresh reads them again.
+        after = (from_ms, "")
+        # A backfill is older than every stored row, so its pages are collected and merged in
+        # once at the end instead of shifting the whole store for every page.
+        backfill: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        while True:
+            page = await self._fetch(after, before_ms)
+            rows = [row for row in page if row["id"] not in self.recent_ids]
+            if rows:
+                self.columns.set_roles(
+                    (row["user_id"] for row in rows), (row["role"] for row in rows)
+                )
+                encoded = self.columns.encode(
+                    [row["user_id"] for row in rows],
+                    [row["module_name"] for row in rows],
+                    [int(row["interaction_ms"]) for row in rows],
+                )
+                if before_ms is None:
+                    self.columns.insert(*encoded)
+                else:
+                    backfill.append(encoded)
+            if page:
+                after = (int(page[-1]["interaction_ms"]), page[-1]["id"])
+            if before_ms is None and rows:
+                self.newest_ms = max(self.newest_ms, after[0])
+                horizon = self.newest_ms - LATE_ROW_TOLERANCE_MS
+                for row in rows:
+                    self.recent_ids[row["id"]] = int(row["interaction_ms"])
+                self.recent_ids = {
+                    row_id: ms
+                    for row_id, ms in self.recent_ids.items()
+                    if ms >= horizon
+                }
+            if len(page) < self.page_size:
+                break
+        if backfill:
+            self.columns.insert(*(np.concatenate(column) for column in zip(*backfill)))
+
+    async def _refresh(self) -> None:
+        started_ms = int(time.time() * 1000)
+        horizon = self.horizon_ms()
+        if self.loaded_from_ms < horizon:
+            self.columns.evict_before(horizon)
+            self.loaded_from_ms = horizon
+        await self._load(
+            max(self.loaded_from_ms, self.newest_ms - LATE_ROW_TOLERANCE_MS)
+        )
+        changed = await prisma.get_client().query_raw(
+            """
+            SELECT "id" AS id, "role"::text AS role FROM "User"
+            WHERE "updatedAt" >= TIMESTAMP 'epoch' + $1::bigint * INTERVAL '1 millisecond'
+            """,
+            self.roles_checked_ms - LATE_ROW_TOLERANCE_MS,
+        )
+        known = [row for row in changed if row["id"] in self.columns.user_codes]
+        self.columns.set_roles(
+            (row["id"] for row in known), (row["role"] for row in known)
+        )
+        self.roles_checked_ms = started_ms
+        self.refreshed_at = time.monotonic()
+
+    async def frame(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        user_id: Optional[str] = None,
+        segment: Optional[str] = None,
+        module_names: Optional[Iterable[str]] = None,
+    ) -> InteractionFrame:
+        """
+        Returns the interactions between start_date and end_date (inclusive), loading any rows not
+        held in memory yet. Interactions older than the retention are never loaded, so callers
+        check `covers(start_date)` first.
+
+        Args:
+            start_date (datetime): Start of the window.
+            end_date (datetime): End of the window.
+            user_id (Optional[str]): Keep only the interactions of this user.
+            segment (Optional[str]): Keep only the interactions of users with this UserRole.
+            module_names (Optional[Iterable[str]]): Keep only the interactions with these modules.
+
+        Returns:
+            InteractionFrame: The matching interactions.
+
+        Raises:
+            ValueError: If the segment or a module name is unknown.
+        """
+        start_ms = max(epoch_ms(start_date), self.horizon_ms())
+        end_ms = epoch_ms(end_date)
+        async with self.lock:
+            if self.loaded_from_ms is None:
+                roles_checked_ms = int(time.time() * 1000)
+                try:
+                    await self._load(start_ms)
+                except BaseException:
+                    # Also on cancellation: drop the partial load so the next query starts over.
+                    self._clear()
+                    raise
+                self.loaded_from_ms = start_ms
+                self.roles_checked_ms = roles_checked_ms
+                self.refreshed_at = time.monotonic()
+            elif start_ms < self.loaded_from_ms:
+                # A backfill is only stored once all of it was read, so a failure leaves the
+                # store as it was.
+                await self._load(start_ms, self.loaded_from_ms)
+                self.loaded_from_ms = start_ms
+            if time.monotonic() - self.refreshed_at >= self.refresh_seconds:
+                await self._refresh()
+            return self.columns.select(start_ms, end_ms, user_id, segment, module_names)
+
+
+store = InteractionStore(
+    project.config.COLUMNAR_ANALYTICS_REFRESH_SECONDS,
+    project.config.COLUMNAR_ANALYTICS_RETENTION_DAYS,
+)
@@ -0,0 +1,261 @@
+import zlib
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # br is only offered and accepted when brotli is installed
+    brotli = None
+
+UNCOMPRESSED_MEDIA_TYPES = ("text/event-stream",)
+
+
+class _BodyTooLarge(Exception):
+    """
+    Raised when a decompressed request body exceeds its size limit.
+    """
+
+
+class _Decoder:
+    """
+    Incrementally decompresses a gzip, deflate or br stream with bounded output.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self.decompressor = brotli.Decompressor()
+            self.finished: Callable[[], bool] = self.decompressor.is_finished
+        else:
+            # 47 = 32 + 15: detect gzip or zlib headers automatically.
+            self.decompressor = zlib.decompressobj(wbits=47)
+            self.finished = lambda: (
+                self.decompressor.eof and not self.decompressor.unused_data
+            )
+
+    def decompress(self, data: bytes, limit: int, final: bool) -> bytes:
+        """
+        Decompresses the next chunk of the stream.
+
+        Output is produced in pieces of at most `limit + 1` bytes, so a chunk that expands a
+        thousandfold fails as soon as it passes the limit instead of being inflated in full.
+
+        Args:
+            data (bytes): The next compressed chunk.
+            limit (int): The most decompressed bytes this chunk may produce.
+            final (bool): Whether this is the last chunk of the stream.
+
+        Returns:
+            bytes: The decompressed chunk.
+
+        Raises:
+            _BodyTooLarge: If the chunk decompresses to more than `limit` bytes.
+        """
+        output = bytearray()
+        while True:
+            budget = limit - len(output) + 1
+            if self.encoding == "br":
+                output += self.decompressor.process(data, output_buffer_limit=budget)
+                data = b""
+                more = not self.decompressor.can_accept_more_data()
+            else:
+                output += self.decompressor.decompress(data, budget)
+                data = self.decompressor.unconsumed_tail
+                more = bool(data)
+            if len(output) > limit:
+                raise _BodyTooLarge()
+            if not more:
+                break
+        if final and self.encoding != "br":
+            # Everything was drained above, so this only returns what zlib still buffers.
+            output += self.decompressor.flush()
+            if len(output) > limit:
+                raise _BodyTooLarge()
+        return bytes(output)
+
+
+class _Encoder:
+    """
+    Incrementally compresses a response body with gzip or br, flushing after every chunk.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=5)
+        else:
+            self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            chunk = self.compressor.process(data)
+            return chunk + (
+                self.compressor.finish() if final else self.compressor.flush()
+            )
+        chunk = self.compressor.compress(data)
+        return chunk + self.compressor.flush(
+            zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        )
+
+
+def supported_encodings() -> tuple[str, ...]:
+    return ("br", "gzip", "deflate") if brotli else ("gzip", "deflate")
+
+
+class RequestDecompressionMiddleware:
+    """
+    Decompresses request bodies sent with `Content-Encoding: gzip`, `deflate` or `br`.
+
+    The body is decompressed chunk by chunk as the application reads it, in bounded pieces.
+    Reading fails with a 413 HTTPException as soon as the (decompressed) body exceeds
+    `max_body_size`, whether or not it was compressed, so a small compressed payload never
+    expands in memory much beyond that limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = (
+            Headers(scope=scope).get("content-encoding", "identity").strip().lower()
+        )
+        decoder: Optional[_Decoder] = None
+        if encoding != "identity":
+            if encoding not in supported_encodings():
+                response = PlainTextResponse(
+                    f"Unsupported Content-Encoding '{encoding}'", status_code=415
+                )
+                await response(scope, receive, send)
+                return
+            decoder = _Decoder(encoding)
+            scope = dict(
+                scope,
+                headers=[
+                    (name, value)
+                    for name, value in scope["headers"]
+                    if name not in (b"content-encoding", b"content-length")
+                ],
+            )
+        received = 0
+
+        async def receive_decompressed() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            body = message.get("body", b"")
+            if decoder:
+                final = not message.get("more_body", False)
+                try:
+                    body = decoder.decompress(
+                        body, self.max_body_size - received, final
+                    )
+                    if final and not decoder.finished():
+                        raise ValueError("stream is truncated or has trailing data")
+                except _BodyTooLarge:
+                    raise HTTPException(413, "Request body too large") from None
+                except Exception as e:
+                    raise HTTPException(
+                        400, f"Could not decode {encoding} request body: {e}"
+                    ) from e
+            received += len(body)
+            if received > self.max_body_size:
+                raise HTTPException(413, "Request body too large")
+            return {**message, "body": body}
+
+        response_started = False
+
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_started
+            response_started |= message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, receive_decompressed, send_tracking)
+        except HTTPException as e:
+            # Reached when the body is read outside of the app's exception handling.
+            if response_started:
+                raise
+            response = PlainTextResponse(e.detail, status_code=e.status_code)
+            await response(scope, receive, send)
+
+
+class ResponseCompressionMiddleware:
+    """
+    Compresses responses with br or gzip, as accepted by the client, once they reach `minimum_size`.
+
+    Streaming responses are compressed chunk by chunk and flushed after every chunk, so streamed
+    exports stay streamed. Responses that already carry a Content-Encoding, and event streams, are
+    passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepted = Headers(scope=scope).get("accept-encoding", "")
+        encoding: Optional[str] = None
+        if brotli and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "")
+                passthrough = "content-encoding" in headers or media_type.startswith(
+                    UNCOMPRESSED_MEDIA_TYPES
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            body: bytes = message.get("body", b"")
+            more_body: bool = message.get("more_body", False)
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                encoder = _Encoder(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                compressed = encoder.compress(body, final=not more_body)
+                if not more_body:
+                    headers["Content-Length"] = str(len(compressed))
+                await send(start_message)
+                start_message = None
+                await send({**message, "body": compressed})
+                return
+            await send({**message, "body": encoder.compress(body, final=not more_body)})
+
+        await self.app(scope, receive, send_compressed)
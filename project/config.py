@@ -0,0 +1,128 @@
+import os
+from typing import Dict, FrozenSet, Optional, Tuple
+
+ROUTE_GROUPS: FrozenSet[str] = frozenset(
+    {"nlp", "analytics", "integration", "datasecurity", "jobs"}
+)
+
+
+def _parse_route_groups(value: str | None) -> FrozenSet[str]:
+    """
+    Parses a comma separated list of route groups, defaulting to every group.
+
+    Args:
+        value (str | None): Raw value of the ENABLED_ROUTE_GROUPS environment variable.
+
+    Returns:
+        FrozenSet[str]: The set of route groups that should be mounted on the app.
+
+    Raises:
+        ValueError: If an unknown route group is requested.
+    """
+    if not value or value.strip() in ("", "*", "all"):
+        return ROUTE_GROUPS
+    groups = frozenset(
+        group.strip().lower() for group in value.split(",") if group.strip()
+    )
+    unknown = groups - ROUTE_GROUPS
+    if unknown:
+        raise ValueError(
+            f"Unknown route groups {sorted(unknown)}; expected any of {sorted(ROUTE_GROUPS)}"
+        )
+    return groups
+
+
+ENABLED_ROUTE_GROUPS: FrozenSet[str] = _parse_route_groups(
+    os.getenv("ENABLED_ROUTE_GROUPS")
+)
+
+PRELOAD_SPACY_MODELS: Tuple[str, ...] = tuple(
+    model.strip()
+    for model in os.getenv("PRELOAD_SPACY_MODELS", "").split(",")
+    if model.strip()
+)
+
+
+def _parse_windows(value: str) -> Tuple[int, ...]:
+    """
+    Parses a comma separated list of window lengths such as '1m,5m,1h' into seconds.
+
+    Args:
+        value (str): Raw value of the LIVE_WINDOWS environment variable.
+
+    Returns:
+        Tuple[int, ...]: Window lengths in seconds, in ascending order.
+
+    Raises:
+        ValueError: If a window is not a positive number of seconds, minutes or hours.
+    """
+    units = {"s": 1, "m": 60, "h": 3600}
+    windows = set()
+    for window in value.split(","):
+        window = window.strip().lower()
+        if not window:
+            continue
+        unit = units.get(window[-1])
+        amount = window[:-1] if unit else window
+        if not amount.isdigit() or int(amount) == 0:
+            raise ValueError(f"Invalid window '{window}'; expected e.g. 30s, 5m or 1h")
+        windows.add(int(amount) * (unit or 1))
+    if not windows:
+        raise ValueError("At least one live window must be configured")
+    return tuple(sorted(windows))
+
+
+LIVE_WINDOWS: Tuple[int, ...] = _parse_windows(os.getenv("LIVE_WINDOWS", "1m,5m,1h"))
+
+LIVE_MAX_TRACKED_USERS: int = int(os.getenv("LIVE_MAX_TRACKED_USERS", "10000"))
+
+NLP_CACHE_DIR: Optional[str] = os.getenv("NLP_CACHE_DIR") or None
+
+NLP_CACHE_MAX_BYTES: Dict[str, int] = {
+    service: int(float(os.getenv(f"NLP_CACHE_{service.upper()}_MB", default)) * 2**20)
+    for service, default in (
+        ("sentiment", "16"),
+        ("entities", "64"),
+        ("translation", "64"),
+    )
+}
+
+MAX_REQUEST_BODY_BYTES: int = int(float(os.getenv("MAX_REQUEST_BODY_MB", "32")) * 2**20)
+
+COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+
+JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+
+JOB_RESULT_TTL_SECONDS: int = int(os.getenv("JOB_RESULT_TTL_SECONDS", "86400"))
+
+JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+JOB_POLL_SECONDS: float = float(os.getenv("JOB_POLL_SECONDS", "1"))
+
+JOB_CONCURRENCY: Dict[str, int] = {
+    job_type: int(
+        os.getenv(f"JOB_CONCURRENCY_{job_type.upper().replace('-', '_')}", default)
+    )
+    for job_type, default in (
+        ("encrypt", "2"),
+        ("entity-recognition", "2"),
+        ("batch-translation", "4"),
+        ("predictive-analytics", "2"),
+    )
+}
+
+COLUMNAR_ANALYTICS: bool = os.getenv("COLUMNAR_ANALYTICS", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+COLUMNAR_ANALYTICS_REFRESH_SECONDS: float = float(
+    os.getenv("COLUMNAR_ANALYTICS_REFRESH_SECONDS", "5")
+)
+
+COLUMNAR_ANALYTICS_RETENTION_DAYS: float = float(
+    os.getenv("COLUMNAR_ANALYTICS_RETENTION_DAYS", "90")
+)
@@ -0,0 +1,238 @@
+import base64
+import csv
+import enum
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import prisma
+import prisma.models
+from pydantic import BaseModel
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+class ExportCursor(BaseModel):
+    """
+    Position of the last exported row, ordered by (timestamp, id).
+    """
+
+    timestamp: datetime
+    id: str
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    """
+    Describes how a table is paged and which of its columns are exported.
+    """
+
+    actions: Callable[[], Any]
+    timestamp_field: str
+    columns: Tuple[str, ...]
+
+
+EXPORT_DATASETS: Dict[str, ExportDataset] = {
+    "interactions": ExportDataset(
+        actions=prisma.models.UserModuleInteraction.prisma,
+        timestamp_field="interactionAt",
+        columns=("id", "userId", "moduleName", "interactionAt"),
+    ),
+    "analytics": ExportDataset(
+        actions=prisma.models.UserAnalytics.prisma,
+        timestamp_field="eventTime",
+        columns=("id", "userId", "event", "eventTime", "details"),
+    ),
+    "feature-usage": ExportDataset(
+        actions=prisma.models.FeatureUsageRecord.prisma,
+        timestamp_field="usedAt",
+        columns=("id", "featureId", "userId", "usedAt", "usageDetails"),
+    ),
+}
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def encode_cursor(cursor: ExportCursor) -> str:
+    """
+    Serializes a cursor into an opaque, URL safe token.
+
+    Args:
+        cursor (ExportCursor): The position of the last exported row.
+
+    Returns:
+        str: A base64url encoded token that can be passed back to resume the export.
+    """
+    return base64.urlsafe_b64encode(cursor.json().encode()).decode()
+
+
+def decode_cursor(token: str) -> ExportCursor:
+    """
+    Parses a token produced by encode_cursor.
+
+    Args:
+        token (str): The opaque cursor token supplied by the client.
+
+    Returns:
+        ExportCursor: The decoded position.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        return ExportCursor.parse_raw(base64.urlsafe_b64decode(token))
+    except Exception as e:
+        raise ValueError(f"Invalid export cursor '{token}'") from e
+
+
+async def iter_rows(
+    dataset: str,
+    start_date: datetime,
+    end_date: datetime,
+    cursor: Optional[ExportCursor] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> AsyncIterator[Tuple[Dict[str, Any], ExportCursor]]:
+    """
+    Pages through a dataset in (timestamp, id) order using keyset pagination.
+
+    Each query starts strictly after the last row of the previous page, so only one page is
+    held in memory at a time and the cost of a page does not grow with its offset.
+
+    Args:
+        dataset (str): One of the keys of EXPORT_DATASETS.
+        start_date (datetime): Inclusive lower bound on the row timestamp.
+        end_date (datetime): Inclusive upper bound on the row timestamp.
+        cursor (Optional[ExportCursor]): Resume after this row instead of at start_date.
+        page_size (int): Number of rows fetched per query.
+
+    Yields:
+        Tuple[Dict[str, Any], ExportCursor]: The exported columns of a row and the cursor pointing at it.
+    """
+    spec = EXPORT_DATASETS[dataset]
+    field = spec.timestamp_field
+    while True:
+        where: Dict[str, Any] = {"AND": [{field: {"gte": start_date, "lte": end_date}}]}
+        if cursor:
+            where["AND"].append(
+                {
+                    "OR": [
+                        {field: {"gt": cursor.timestamp}},
+                        {field: {"equals": cursor.timestamp}, "id": {"gt": cursor.id}},
+                    ]
+                }
+            )
+        page = await spec.actions().find_many(
+            where=where, order=[{field: "asc"}, {"id": "asc"}], take=page_size
+        )
+        for record in page:
+            cursor = ExportCursor(timestamp=getattr(record, field), id=record.id)
+            yield {column: getattr(record, column) for column in spec.columns}, cursor
+        if len(page) < page_size:
+            return
+
+
+def _serialize_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def format_ndjson(row: Dict[str, Any], token: str) -> str:
+    """
+    Renders a row as a single JSON line, including the cursor to resume after it.
+    """
+    record = {column: _serialize_value(value) for column, value in row.items()}
+    record["cursor"] = token
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def format_csv(row: Dict[str, Any], token: str) -> str:
+    """
+    Renders a row as a CSV line, with JSON columns encoded as JSON strings and the cursor last.
+    """
+    buffer = io.StringIO()
+    values: List[Any] = [
+        (
+            json.dumps(value)
+            if isinstance(value, (dict, list))
+            else _serialize_value(value)
+        )
+        for value in row.values()
+    ]
+    csv.writer(buffer).writerow(values + [token])
+    return buffer.getvalue()
+
+
+async def export_data(
+    dataset: str,
+    start_date: datetime,
+    end_date: datetime,
+    export_format: str = "ndjson",
+    cursor: Optional[str] = None,
+    compress: bool = False,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Streams the rows of a dataset within a date range as NDJSON or CSV.
+
+    Every row carries a cursor token; passing the token of the last row received as `cursor`
+    resumes the export immediately after it. Memory use is bounded by `page_size` regardless of
+    how many rows the range contains.
+
+    Args:
+        dataset (str): 'interactions', 'analytics' or 'feature-usage'.
+        start_date (datetime): Inclusive start of the range to export.
+        end_date (datetime): Inclusive end of the range to export.
+        export_format (str): 'ndjson' or 'csv'.
+        cursor (Optional[str]): Token of the last row previously received.
+        compress (bool): Gzip the stream.
+        page_size (int): Number of rows fetched from the database per query.
+
+    Returns:
+        AsyncIterator[bytes]: Chunks of the encoded export, one per database page.
+
+    Raises:
+        ValueError: If the dataset, format or cursor is invalid. Raised before any data is streamed.
+
+    Example:
+        chunks = await export_data('interactions', datetime(2024, 1, 1), datetime(2024, 3, 31))
+        async for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise ValueError(
+            f"Unknown dataset '{dataset}'; expected one of {sorted(EXPORT_DATASETS)}"
+        )
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise ValueError(
+            f"Unknown export format '{export_format}'; expected one of {sorted(EXPORT_MEDIA_TYPES)}"
+        )
+    resume_after = decode_cursor(cursor) if cursor else None
+    columns = EXPORT_DATASETS[dataset].columns
+
+    async def stream() -> AsyncIterator[bytes]:
+        compressor = zlib.compressobj(wbits=31) if compress else None
+        lines: List[str] = []
+        if export_format == "csv" and not resume_after:
+            lines.append(",".join(columns + ("cursor",)) + "\r\n")
+        formatter = format_csv if export_format == "csv" else format_ndjson
+        async for row, row_cursor in iter_rows(
+            dataset, start_date, end_date, resume_after, page_size
+        ):
+            lines.append(formatter(row, encode_cursor(row_cursor)))
+            if len(lines) >= page_size:
+                chunk = "".join(lines).encode()
+                lines.clear()
+                yield compressor.compress(chunk) if compressor else chunk
+        chunk = "".join(lines).encode()
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush()
+        if chunk:
+            yield chunk
+
+    return stream()
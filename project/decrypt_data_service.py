@@ -1,9 +1,17 @@
 from typing import Optional
 
-from cryptography.fernet import Fernet
 from pydantic import BaseModel
 
 
+class DecryptDataRequest(BaseModel):
+    """
+    Request body for decrypting data, optionally with an explicit key.
+    """
+
+    encrypted_data: str
+    decryption_key: Optional[str] = None
+
+
 class DecryptDataResponse(BaseModel):
     """
     This model represents the response after decrypting the data, containing the original plaintext data.
@@ -26,6 +34,8 @@ def decrypt_data(
     Returns:
         DecryptDataResponse: This model represents the response after decrypting the data, containing the original plaintext data.
     """
+    from cryptography.fernet import Fernet
+
     standard_key = b"aGv7HmL8BsNo3tpxZ4YjW_EPdS3fiIuOQbqBmyn8h1E="
     key_to_use = decryption_key.encode() if decryption_key else standard_key
     fernet = Fernet(key_to_use)
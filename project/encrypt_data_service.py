@@ -2,14 +2,18 @@ import base64
 import os
 from typing import Optional
 
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 from pydantic import BaseModel
 
 
+class EncryptDataRequest(BaseModel):
+    """
+    Request body for encrypting data, optionally naming the key derivation schema.
+    """
+
+    data: str
+    encryption_schema: Optional[str] = None
+
+
 class EncryptDataResponse(BaseModel):
     """
     The response model returning the result of the encryption process.
@@ -37,6 +41,12 @@ def encrypt_data(
         encrypt_data('Hello, World!')
         > EncryptDataResponse(encrypted_data='encrypted_base64_string')
     """
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
     salt = os.urandom(16)
     backend = default_backend()
     if encryption_schema == "PBKDF2HMAC":
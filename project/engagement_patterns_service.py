@@ -3,8 +3,14 @@ from typing import Any, Dict, List, Optional
 
 import prisma
 import prisma.models
+import project.config
 from pydantic import BaseModel
 
+RECOMMENDATIONS = [
+    "Review modules with lower engagement for potential UX improvements.",
+    "Consider additional features for modules with high engagement.",
+]
+
 
 class EngagementPatternsResponse(BaseModel):
     """
@@ -14,6 +20,8 @@ class EngagementPatternsResponse(BaseModel):
     overview: str
     details: Dict[str, Any]
     recommendations: List[str]
+    approximate: bool = False
+    error_bounds: Optional[Dict[str, Any]] = None
 
 
 async def engagement_patterns(
@@ -30,6 +38,11 @@ async def engagement_patterns(
     Returns:
         EngagementPatternsResponse: Provides summarized data and insights into user engagement patterns within the specified period.
     """
+    if project.config.COLUMNAR_ANALYTICS:
+        from project.columnar_analytics import store
+
+        if store.covers(start_date):
+            return await columnar_engagement_patterns(start_date, end_date, segment)
     where_segment = {}
     if segment:
         where_segment["user"] = {"role": {"equals": segment}}
@@ -51,10 +64,34 @@ async def engagement_patterns(
         "total_interactions": len(interactions),
         "interactions_by_module": module_interaction_counts,
     }
-    recommendations = [
-        "Review modules with lower engagement for potential UX improvements.",
-        "Consider additional features for modules with high engagement.",
-    ]
+    recommendations = RECOMMENDATIONS
     return EngagementPatternsResponse(
         overview=overview, details=details, recommendations=recommendations
     )
+
+
+async def columnar_engagement_patterns(
+    start_date: datetime, end_date: datetime, segment: Optional[str] = None
+) -> EngagementPatternsResponse:
+    """
+    Computes the same engagement patterns from the in-memory columnar interaction store.
+
+    Args:
+        start_date (datetime): Start date for the period to analyze engagement patterns.
+        end_date (datetime): End date for the period to analyze engagement patterns.
+        segment (Optional[str]): Optional user segment to filter the analysis.
+
+    Returns:
+        EngagementPatternsResponse: Provides summarized data and insights into user engagement patterns within the specified period.
+    """
+    from project.columnar_analytics import store
+
+    frame = await store.frame(start_date, end_date, segment=segment or None)
+    return EngagementPatternsResponse(
+        overview="Engagement analysis for the selected period.",
+        details={
+            "total_interactions": len(frame),
+            "interactions_by_module": frame.module_counts(),
+        },
+        recommendations=RECOMMENDATIONS,
+    )
@@ -1,8 +1,24 @@
-from typing import List, Optional
+import re
+from functools import lru_cache
+from importlib import metadata
+from typing import TYPE_CHECKING, List, Optional
 
-import spacy
 from pydantic import BaseModel
-from spacy.language import Language
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+
+# ISO 639 language codes; anything else is rejected before it reaches a package name or path.
+LANGUAGE_CODE = re.compile(r"[a-z]{2,3}")
+
+
+class EntityRecognitionRequest(BaseModel):
+    """
+    Request body for entity recognition, with an optional language code such as 'en' or 'de'.
+    """
+
+    text: str
+    language: Optional[str] = None
 
 
 class Entity(BaseModel):
@@ -23,6 +39,61 @@ class EntityRecognitionResponse(BaseModel):
     entities: List[Entity]
 
 
+@lru_cache(maxsize=None)
+def load_pipeline(lang_model: str) -> "Language":
+    """
+    Loads a spaCy pipeline once per process and reuses it for subsequent requests.
+
+    spaCy is imported here rather than at module level so that workers which never
+    serve entity recognition do not pay its import cost at startup.
+
+    Args:
+        lang_model (str): The name of the installed spaCy pipeline, e.g. 'en_core_web_sm'.
+
+    Returns:
+        Language: The loaded spaCy pipeline.
+
+    Raises:
+        OSError: If the pipeline is not installed.
+    """
+    import spacy
+
+    return spacy.load(lang_model)
+
+
+def pipeline_name(language: Optional[str] = None) -> str:
+    """
+    Returns the name of the spaCy pipeline used for the given language code.
+
+    Raises:
+        ValueError: If the language is not a two or three letter lowercase language code.
+    """
+    if not language or language == "en":
+        return "en_core_web_sm"
+    if not LANGUAGE_CODE.fullmatch(language):
+        raise ValueError(
+            f"Invalid language '{language}'; expected a language code such as 'de'"
+        )
+    return f"{language}_core_news_sm"
+
+
+@lru_cache(maxsize=64)
+def pipeline_version(lang_model: str) -> str:
+    """
+    Returns the installed versions of spaCy and of the given pipeline package.
+
+    Reads package metadata only, so the pipeline does not have to be loaded. Installed versions
+    cannot change while the process runs, so the result is computed once per pipeline.
+    """
+    versions = []
+    for package in ("spacy", lang_model):
+        try:
+            versions.append(f"{package}=={metadata.version(package)}")
+        except metadata.PackageNotFoundError:
+            versions.append(f"{package} not installed")
+    return ", ".join(versions)
+
+
 def entity_recognition(
     text: str, language: Optional[str] = None
 ) -> EntityRecognitionResponse:
@@ -39,13 +110,10 @@ def entity_recognition(
     Raises:
         ValueError: If the specified language model is not supported or not installed.
     """
-    nlp: Language
-    if not language or language == "en":
-        lang_model = "en_core_web_sm"
-    else:
-        lang_model = f"{language}_core_news_sm"
+    nlp: "Language"
+    lang_model = pipeline_name(language)
     try:
-        nlp = spacy.load(lang_model)
+        nlp = load_pipeline(lang_model)
     except OSError:
         raise ValueError(
             f"Language model for '{language}' not found. Please install the spaCy language model '{lang_model}'."
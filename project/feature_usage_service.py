@@ -0,0 +1,186 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import prisma
+from pydantic import BaseModel
+
+TIME_BUCKETS = ("hour", "day", "week", "month")
+
+
+class FeatureUsageBucket(BaseModel):
+    """
+    Number of times a feature was used within one time bucket.
+    """
+
+    bucket_start: datetime
+    usage_count: int
+
+
+class FeatureUser(BaseModel):
+    """
+    A user together with how often they used a feature.
+    """
+
+    user_id: str
+    usage_count: int
+
+
+class FeatureUsageSummary(BaseModel):
+    """
+    Usage statistics of a single module feature over the requested period.
+    """
+
+    feature_id: str
+    feature_name: str
+    module_name: str
+    usage_count: int
+    distinct_users: int
+    buckets: List[FeatureUsageBucket]
+    top_users: List[FeatureUser]
+
+
+class FeatureUsageResponse(BaseModel):
+    """
+    Feature usage statistics for the requested period, ordered by usage count.
+    """
+
+    bucket: str
+    features: List[FeatureUsageSummary]
+
+
+def _utc_timestamp(value: datetime) -> str:
+    """
+    Formats a datetime as a UTC timestamp literal, treating naive datetimes as UTC like Prisma does.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _build_filter(
+    start_date: datetime,
+    end_date: datetime,
+    feature_id: Optional[str],
+    details_filter: Optional[Dict[str, Any]],
+) -> Tuple[str, List[Any]]:
+    """
+    Builds the shared WHERE clause and its positional parameters.
+
+    The `usageDetails @> filter` containment test is answered by the GIN index on usageDetails,
+    and the usedAt range by the (usedAt, id) index, so neither requires a full table scan.
+    """
+    clauses = ['r."usedAt" >= $1::timestamp', 'r."usedAt" <= $2::timestamp']
+    params: List[Any] = [_utc_timestamp(start_date), _utc_timestamp(end_date)]
+    if feature_id:
+        params.append(feature_id)
+        clauses.append(f'r."featureId" = ${len(params)}')
+    if details_filter:
+        params.append(json.dumps(details_filter))
+        clauses.append(f'r."usageDetails" @> ${len(params)}::jsonb')
+    return " AND ".join(clauses), params
+
+
+async def feature_usage(
+    start_date: datetime,
+    end_date: datetime,
+    bucket: str = "day",
+    feature_id: Optional[str] = None,
+    details_filter: Optional[str] = None,
+    top_users: int = 5,
+) -> FeatureUsageResponse:
+    """
+    Aggregates FeatureUsageRecord rows per feature and per time bucket.
+
+    All aggregation happens in PostgreSQL; only one row per feature, per (feature, bucket) and
+    per ranked top user is returned to the application regardless of how many records match.
+
+    Args:
+        start_date (datetime): Start of the period to analyze.
+        end_date (datetime): End of the period to analyze.
+        bucket (str): Time bucket size, one of 'hour', 'day', 'week' or 'month'.
+        feature_id (Optional[str]): Restrict the analysis to a single feature.
+        details_filter (Optional[str]): A JSON object; only records whose usageDetails contain it are counted.
+        top_users (int): Number of heaviest users to report per feature.
+
+    Returns:
+        FeatureUsageResponse: Feature usage statistics for the requested period, ordered by usage count.
+
+    Raises:
+        ValueError: If the bucket is unknown or details_filter is not a JSON object.
+
+    Example:
+        response = await feature_usage(
+            datetime(2024, 1, 1), datetime(2024, 3, 31), bucket='week', details_filter='{"plan": "pro"}'
+        )
+    """
+    if bucket not in TIME_BUCKETS:
+        raise ValueError(f"Unknown bucket '{bucket}'; expected one of {TIME_BUCKETS}")
+    parsed_filter = json.loads(details_filter) if details_filter else None
+    if parsed_filter is not None and not isinstance(parsed_filter, dict):
+        raise ValueError("details_filter must be a JSON object")
+    where, params = _build_filter(start_date, end_date, feature_id, parsed_filter)
+    client = prisma.get_client()
+    totals = await client.query_raw(
+        f"""
+        SELECT r."featureId" AS feature_id, f."name" AS feature_name, m."name"::text AS module_name,
+               COUNT(*) AS usage_count, COUNT(DISTINCT r."userId") AS distinct_users
+        FROM "FeatureUsageRecord" r
+        JOIN "ModuleFeature" f ON f."id" = r."featureId"
+        JOIN "Module" m ON m."id" = f."moduleId"
+        WHERE {where}
+        GROUP BY r."featureId", f."name", m."name"
+        ORDER BY usage_count DESC
+        """,
+        *params,
+    )
+    buckets = await client.query_raw(
+        f"""
+        SELECT r."featureId" AS feature_id,
+               date_trunc('{bucket}', r."usedAt") AS bucket_start, COUNT(*) AS usage_count
+        FROM "FeatureUsageRecord" r
+        WHERE {where}
+        GROUP BY feature_id, bucket_start
+        ORDER BY feature_id, bucket_start
+        """,
+        *params,
+    )
+    ranked_users = await client.query_raw(
+        f"""
+        SELECT feature_id, user_id, usage_count FROM (
+            SELECT r."featureId" AS feature_id, r."userId" AS user_id, COUNT(*) AS usage_count,
+                   ROW_NUMBER() OVER (PARTITION BY r."featureId" ORDER BY COUNT(*) DESC) AS rank
+            FROM "FeatureUsageRecord" r
+            WHERE {where}
+            GROUP BY r."featureId", r."userId"
+        ) ranked
+        WHERE rank <= {int(top_users)}
+        ORDER BY feature_id, rank
+        """,
+        *params,
+    )
+    buckets_by_feature: Dict[str, List[FeatureUsageBucket]] = {}
+    for row in buckets:
+        buckets_by_feature.setdefault(row["feature_id"], []).append(
+            FeatureUsageBucket(
+                bucket_start=row["bucket_start"], usage_count=row["usage_count"]
+            )
+        )
+    users_by_feature: Dict[str, List[FeatureUser]] = {}
+    for row in ranked_users:
+        users_by_feature.setdefault(row["feature_id"], []).append(
+            FeatureUser(user_id=row["user_id"], usage_count=row["usage_count"])
+        )
+    features = [
+        FeatureUsageSummary(
+            feature_id=row["feature_id"],
+            feature_name=row["feature_name"],
+            module_name=row["module_name"],
+            usage_count=row["usage_count"],
+            distinct_users=row["distinct_users"],
+            buckets=buckets_by_feature.get(row["feature_id"], []),
+            top_users=users_by_feature.get(row["feature_id"], []),
+        )
+        for row in totals
+    ]
+    return FeatureUsageResponse(bucket=bucket, features=features)
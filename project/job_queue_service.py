@@ -0,0 +1,399 @@
+import asyncio
+import json
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Type
+
+import prisma
+import prisma.enums
+import prisma.models
+import project.config
+import project.encrypt_data_service
+import project.entity_recognition_service
+import project.language_translation_service
+import project.predictive_analytics_service
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_INTERVAL_SECONDS = 30
+
+
+class JobStatusResponse(BaseModel):
+    """
+    Current state of a background job.
+    """
+
+    job_id: str
+    job_type: str
+    status: str
+    priority: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class JobResultResponse(BaseModel):
+    """
+    Result of a finished background job, in the response format of the equivalent endpoint.
+    """
+
+    job_id: str
+    status: str
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class JobType:
+    """
+    How a job type validates its parameters and runs.
+    """
+
+    request_model: Type[BaseModel]
+    run: Callable[[Any], Awaitable[BaseModel]]
+
+
+JOB_TYPES: Dict[str, JobType] = {
+    "encrypt": JobType(
+        request_model=project.encrypt_data_service.EncryptDataRequest,
+        run=lambda request: run_in_threadpool(
+            project.encrypt_data_service.encrypt_data,
+            request.data,
+            request.encryption_schema,
+        ),
+    ),
+    "entity-recognition": JobType(
+        request_model=project.entity_recognition_service.EntityRecognitionRequest,
+        run=lambda request: run_in_threadpool(
+            project.entity_recognition_service.entity_recognition,
+            request.text,
+            request.language,
+        ),
+    ),
+    "batch-translation": JobType(
+        request_model=project.language_translation_service.BatchTranslationRequest,
+        run=lambda request: run_in_threadpool(
+            project.language_translation_service.batch_language_translation,
+            request.source_texts,
+            request.source_language,
+            request.target_language,
+        ),
+    ),
+    "predictive-analytics": JobType(
+        request_model=project.predictive_analytics_service.PredictiveAnalyticsRequest,
+        run=lambda request: project.predictive_analytics_service.predictive_analytics(
+            request.start_date, request.end_date
+        ),
+    ),
+}
+
+
+def _status_response(job: prisma.models.Job) -> JobStatusResponse:
+    return JobStatusResponse(
+        job_id=job.id,
+        job_type=job.type,
+        status=job.status.value,
+        priority=job.priority,
+        created_at=job.createdAt,
+        started_at=job.startedAt,
+        finished_at=job.finishedAt,
+        expires_at=job.expiresAt,
+        error=job.error,
+    )
+
+
+def _claimed(job_id: str, claim_token: str) -> Dict[str, Any]:
+    # Matches the job only while it is running under the given claim.
+    return {
+        "id": job_id,
+        "status": prisma.enums.JobStatus.Running,
+        "claimToken": claim_token,
+    }
+
+
+class JobWorkerPool:
+    """
+    Runs queued jobs from the Job table in the current process, highest priority first.
+
+    At most `workers` jobs run at a time in total, and at most `concurrency[job_type]` of each
+    type. Jobs are claimed straight from the database with `FOR UPDATE SKIP LOCKED`, so every
+    process running a pool takes work from the same queue and each job is claimed once. Only
+    types with a free slot are claimed, so a backlog of one capped type never holds back jobs of
+    other types.
+
+    A running job holds a lease that is renewed while it runs. Jobs interrupted by a graceful
+    shutdown are put back in the queue right away; jobs whose worker died are requeued once their
+    lease expires, and failed after `JOB_MAX_ATTEMPTS` attempts. Every claim gets a fresh token,
+    and a worker only updates a job while it still holds its claim, so a worker whose lease
+    expired cannot overwrite a job that was requeued and claimed again.
+    """
+
+    def __init__(self, workers: int, concurrency: Dict[str, int]) -> None:
+        self.workers = workers
+        self.concurrency = concurrency
+        self.running: Counter = Counter()
+        self.active: Set[asyncio.Task] = set()
+        self.wakeup = asyncio.Event()
+        self.tasks: List[asyncio.Task] = []
+
+    def notify(self) -> None:
+        """
+        Wakes the dispatcher, e.g. after a job was submitted, instead of waiting for the next poll.
+        """
+        self.wakeup.set()
+
+    async def start(self) -> None:
+        self.tasks = [
+            asyncio.create_task(self._dispatch()),
+            asyncio.create_task(self._maintain()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self.tasks + list(self.active):
+            task.cancel()
+        await asyncio.gather(*self.tasks, *self.active, return_exceptions=True)
+        self.tasks = []
+
+    async def _claim(self, job_types: List[str]) -> Optional[Dict[str, Any]]:
+        rows = await prisma.get_client().query_raw(
+            """
+            UPDATE "Job"
+            SET "status" = 'Running',
+                "startedAt" = now() AT TIME ZONE 'UTC',
+                "leaseExpiresAt" = now() AT TIME ZONE 'UTC' + $2::int * INTERVAL '1 second',
+                "attempts" = "attempts" + 1,
+                "claimToken" = gen_random_uuid()::text
+            WHERE "id" = (
+                SELECT "id" FROM "Job"
+                WHERE "status" = 'Queued' AND "type" = ANY(string_to_array($1, ','))
+                ORDER BY "priority" DESC, "createdAt"
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING "id" AS id, "type" AS type, "params"::text AS params,
+                      "claimToken" AS claim_token
+            """,
+            ",".join(job_types),
+            project.config.JOB_LEASE_SECONDS,
+        )
+        return rows[0] if rows else None
+
+    async def _dispatch(self) -> None:
+        while True:
+            job: Optional[Dict[str, Any]] = None
+            free_types = [
+                job_type
+                for job_type in JOB_TYPES
+                if self.running[job_type] < self.concurrency.get(job_type, 1)
+            ]
+            if len(self.active) < self.workers and free_types:
+                try:
+                    job = await self._claim(free_types)
+                except Exception:
+                    logger.exception("Could not claim a job")
+            if job is not None:
+                self._start(job)
+                continue
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self.wakeup.wait(), project.config.JOB_POLL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def _start(self, job: Dict[str, Any]) -> None:
+        job_type = job["type"]
+        self.running[job_type] += 1
+        task = asyncio.create_task(
+            self._run(job["id"], job["claim_token"], job_type, job["params"])
+        )
+        self.active.add(task)
+
+        def finished(task: asyncio.Task) -> None:
+            self.active.discard(task)
+            self.running[job_type] -= 1
+            self.wakeup.set()
+
+        task.add_done_callback(finished)
+
+    async def _heartbeat(self, job_id: str, claim_token: str) -> None:
+        # Keeps renewing through database errors: a dead heartbeat would let the lease expire
+        # and the job be run a second time while this worker is still running it.
+        while True:
+            await asyncio.sleep(project.config.JOB_LEASE_SECONDS / 3)
+            try:
+                renewed = await prisma.models.Job.prisma().update_many(
+                    where=_claimed(job_id, claim_token),
+                    data={
+                        "leaseExpiresAt": datetime.now(timezone.utc)
+                        + timedelta(seconds=project.config.JOB_LEASE_SECONDS)
+                    },
+                )
+                if not renewed:
+                    logger.warning("Job %s lost its claim while running", job_id)
+            except Exception:
+                logger.exception("Could not renew the lease of job %s", job_id)
+
+    async def _run(
+        self, job_id: str, claim_token: str, job_type: str, params: str
+    ) -> None:
+        spec = JOB_TYPES[job_type]
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, claim_token))
+        data: Dict[str, Any]
+        try:
+            result = await spec.run(spec.request_model.parse_raw(params))
+            data = {
+                "status": prisma.enums.JobStatus.Succeeded,
+                "result": prisma.Json(json.loads(result.json())),
+            }
+        except asyncio.CancelledError:
+            # Interrupted by a shutdown rather than failed: hand the job to another worker.
+            await prisma.models.Job.prisma().update_many(
+                where=_claimed(job_id, claim_token),
+                data={
+                    "status": prisma.enums.JobStatus.Queued,
+                    "startedAt": None,
+                    "leaseExpiresAt": None,
+                    "claimToken": None,
+                    "attempts": {"decrement": 1},
+                },
+            )
+            raise
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            data = {"status": prisma.enums.JobStatus.Failed, "error": str(e)}
+        finally:
+            heartbeat.cancel()
+        finished_at = datetime.now(timezone.utc)
+        updated = await prisma.models.Job.prisma().update_many(
+            where=_claimed(job_id, claim_token),
+            data={
+                **data,
+                # Parameters may hold sensitive input such as plaintext to encrypt.
+                "params": prisma.Json({}),
+                "leaseExpiresAt": None,
+                "claimToken": None,
+                "finishedAt": finished_at,
+                "expiresAt": finished_at
+                + timedelta(seconds=project.config.JOB_RESULT_TTL_SECONDS),
+            },
+        )
+        if not updated:
+            logger.warning(
+                "Job %s was claimed again before it finished; discarding this result",
+                job_id,
+            )
+
+    async def _maintain(self) -> None:
+        while True:
+            try:
+                await prisma.get_client().execute_raw(
+                    """
+                    UPDATE "Job"
+                    SET "status" = CASE WHEN "attempts" >= $1 THEN 'Failed' ELSE 'Queued' END::"JobStatus",
+                        "error" = CASE WHEN "attempts" >= $1
+                            THEN 'Worker stopped while running the job' ELSE "error" END,
+                        "params" = CASE WHEN "attempts" >= $1 THEN '{}'::jsonb ELSE "params" END,
+                        "finishedAt" = CASE WHEN "attempts" >= $1
+                            THEN now() AT TIME ZONE 'UTC' ELSE NULL END,
+                        "expiresAt" = CASE WHEN "attempts" >= $1
+                            THEN now() AT TIME ZONE 'UTC' + $2::int * INTERVAL '1 second' ELSE NULL END,
+                        "startedAt" = CASE WHEN "attempts" >= $1 THEN "startedAt" ELSE NULL END,
+                        "leaseExpiresAt" = NULL,
+                        "claimToken" = NULL
+                    WHERE "status" = 'Running' AND "leaseExpiresAt" < now() AT TIME ZONE 'UTC'
+                    """,
+                    project.config.JOB_MAX_ATTEMPTS,
+                    project.config.JOB_RESULT_TTL_SECONDS,
+                )
+                await prisma.models.Job.prisma().delete_many(
+                    where={"expiresAt": {"lt": datetime.now(timezone.utc)}}
+                )
+            except Exception:
+                logger.exception("Could not requeue stale jobs or delete expired jobs")
+            await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
+
+
+pool = JobWorkerPool(project.config.JOB_WORKERS, project.config.JOB_CONCURRENCY)
+
+
+async def submit_job(
+    job_type: str, params: Dict[str, Any], priority: int = 0
+) -> JobStatusResponse:
+    """
+    Validates a job and adds it to the queue in the Job table, where any worker pool can claim it.
+
+    Args:
+        job_type (str): One of 'encrypt', 'entity-recognition', 'batch-translation' or 'predictive-analytics'.
+        params (Dict[str, Any]): The request body of the equivalent synchronous endpoint.
+        priority (int): Jobs with a higher priority run first.
+
+    Returns:
+        JobStatusResponse: The newly queued job.
+
+    Raises:
+        ValueError: If the job type is unknown or the parameters are invalid.
+    """
+    if job_type not in JOB_TYPES:
+        raise ValueError(
+            f"Unknown job type '{job_type}'; expected one of {sorted(JOB_TYPES)}"
+        )
+    request = JOB_TYPES[job_type].request_model.parse_obj(params)
+    job = await prisma.models.Job.prisma().create(
+        data={
+            "type": job_type,
+            "priority": priority,
+            "params": prisma.Json(json.loads(request.json())),
+        }
+    )
+    pool.notify()
+    return _status_response(job)
+
+
+async def _find_live_job(job_id: str) -> prisma.models.Job:
+    job = await prisma.models.Job.prisma().find_unique(where={"id": job_id})
+    if not job or (job.expiresAt and job.expiresAt < datetime.now(timezone.utc)):
+        raise ValueError(f"No job found with id '{job_id}'")
+    return job
+
+
+async def job_status(job_id: str) -> JobStatusResponse:
+    """
+    Returns the current state of a job.
+
+    Args:
+        job_id (str): The id returned when the job was submitted.
+
+    Returns:
+        JobStatusResponse: Current state of the background job.
+
+    Raises:
+        ValueError: If the job does not exist or its result has expired.
+    """
+    return _status_response(await _find_live_job(job_id))
+
+
+async def job_result(job_id: str) -> JobResultResponse:
+    """
+    Returns the result of a job; `result` stays empty until the job has succeeded.
+
+    Args:
+        job_id (str): The id returned when the job was submitted.
+
+    Returns:
+        JobResultResponse: Result of the background job.
+
+    Raises:
+        ValueError: If the job does not exist or its result has expired.
+    """
+    job = await _find_live_job(job_id)
+    return JobResultResponse(
+        job_id=job.id, status=job.status.value, result=job.result, error=job.error
+    )
@@ -1,9 +1,20 @@
-from typing import Optional
+from functools import lru_cache
+from importlib import metadata
+from typing import List, Optional
 
-from google.cloud import translate_v2 as translate
 from pydantic import BaseModel
 
 
+class LanguageTranslationRequest(BaseModel):
+    """
+    Request body for translating a text between two language codes.
+    """
+
+    source_text: str
+    source_language: str
+    target_language: str
+
+
 class LanguageTranslationResponse(BaseModel):
     """
     The outcome of the translation process, including the translated text and any relevant status information.
@@ -14,6 +25,33 @@ class LanguageTranslationResponse(BaseModel):
     error: Optional[str] = None
 
 
+TRANSLATION_MODEL = "google-translate-v2"
+
+
+@lru_cache(maxsize=1)
+def translation_version() -> str:
+    """
+    Returns the installed version of the Google Cloud Translation client library, read once per process.
+    """
+    try:
+        return metadata.version("google-cloud-translate")
+    except metadata.PackageNotFoundError:
+        return "not installed"
+
+
+@lru_cache(maxsize=1)
+def get_client():
+    """
+    Creates the Google Cloud Translation client on first use and reuses it afterwards.
+
+    Returns:
+        google.cloud.translate_v2.Client: The shared translation client.
+    """
+    from google.cloud import translate_v2 as translate
+
+    return translate.Client()
+
+
 def language_translation(
     source_text: str, source_language: str, target_language: str
 ) -> LanguageTranslationResponse:
@@ -36,7 +74,7 @@ def language_translation(
         print(f"Translation failed with error: {response.error}")
     """
     try:
-        client = translate.Client()
+        client = get_client()
         result = client.translate(
             source_text,
             source_language=source_language,
@@ -50,3 +88,58 @@ def language_translation(
         return LanguageTranslationResponse(
             translated_text="", status="error", error=str(e)
         )
+
+
+class BatchTranslationRequest(BaseModel):
+    """
+    Request body for translating several texts between the same two language codes.
+    """
+
+    source_texts: List[str]
+    source_language: str
+    target_language: str
+
+
+class BatchTranslationResponse(BaseModel):
+    """
+    The outcome of a batch translation, with one result per input text in input order.
+    """
+
+    translations: List[LanguageTranslationResponse]
+
+
+def batch_language_translation(
+    source_texts: List[str], source_language: str, target_language: str
+) -> BatchTranslationResponse:
+    """
+    Translates several texts in a single call to the translation API.
+
+    Args:
+        source_texts (List[str]): The texts to be translated.
+        source_language (str): The language code of the source texts (e.g., 'en' for English).
+        target_language (str): The language code of the target translation (e.g., 'fr' for French).
+
+    Returns:
+        BatchTranslationResponse: One translation result per input text. If the API call fails,
+        every result carries the error.
+    """
+    try:
+        results = get_client().translate(
+            source_texts,
+            source_language=source_language,
+            target_language=target_language,
+        )
+        translations = [
+            LanguageTranslationResponse(
+                translated_text=result["translatedText"], status="success"
+            )
+            for result in results
+        ]
+    except Exception as e:
+        translations = [
+            LanguageTranslationResponse(
+                translated_text="", status="error", error=str(e)
+            )
+            for _ in source_texts
+        ]
+    return BatchTranslationResponse(translations=translations)
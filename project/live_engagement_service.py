@@ -0,0 +1,272 @@
+import asyncio
+import heapq
+import time
+from array import array
+from collections import OrderedDict
+from itertools import islice
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import project.config
+from pydantic import BaseModel
+from starlette.datastructures import Headers, QueryParams
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+MIN_INTERVAL_SECONDS = 0.1
+MAX_TOP_USERS = 100
+
+# Requests for the live stream itself are not engagement with the analytics module.
+UNTRACKED_PATH_PREFIXES = ("/analytics/live",)
+
+
+class WindowRates(BaseModel):
+    """
+    Interaction counts and per-second rates of one key over each configured window.
+    """
+
+    counts: Dict[str, int]
+    rates_per_second: Dict[str, float]
+
+
+class LiveEngagementSnapshot(BaseModel):
+    """
+    Current interaction rates per module and for the most active users.
+    """
+
+    timestamp: float
+    modules: Dict[str, WindowRates]
+    users: Dict[str, WindowRates]
+
+
+class SlidingWindowCounter:
+    """
+    Counts events over several trailing windows using a ring buffer of per-second buckets.
+
+    A running total is kept for every window. Advancing the clock subtracts the buckets that
+    fell out of each window and clears the buckets of the elapsed seconds with slice operations,
+    and a window the clock moved past entirely is reset outright, so recording an event and
+    reading a window total take a constant number of Python steps per window, regardless of the
+    event rate or of how long the counter sat idle.
+    """
+
+    __slots__ = ("windows", "buckets", "totals", "current_second")
+
+    def __init__(self, windows: Tuple[int, ...], now: Optional[int] = None) -> None:
+        self.windows = windows
+        self.buckets = array("I", bytes(4 * max(windows)))
+        self.totals = [0] * len(windows)
+        self.current_second = int(time.time()) if now is None else now
+
+    def _advance(self, now: int) -> None:
+        elapsed = now - self.current_second
+        if elapsed <= 0:
+            return
+        size = len(self.buckets)
+        if elapsed >= size:
+            self.buckets = array("I", bytes(4 * size))
+            self.totals = [0] * len(self.windows)
+            self.current_second = now
+            return
+        for index, window in enumerate(self.windows):
+            if elapsed >= window:
+                self.totals[index] = 0
+            elif elapsed <= window - elapsed:
+                # Subtract the seconds that left the window, current_second - window + 1 ..
+                # now - window.
+                self.totals[index] -= self._sum(
+                    self.current_second - window + 1, elapsed
+                )
+            else:
+                # Fewer seconds stayed in the window than left it: recount those,
+                # now - window + 1 .. current_second.
+                self.totals[index] = self._sum(now - window + 1, window - elapsed)
+        for part in self._ring(self.current_second + 1, elapsed):
+            self.buckets[part] = array("I", bytes(4 * (part.stop - part.start)))
+        self.current_second = now
+
+    def _sum(self, first_second: int, count: int) -> int:
+        return sum(sum(self.buckets[part]) for part in self._ring(first_second, count))
+
+    def _ring(self, first_second: int, count: int) -> List[slice]:
+        # The bucket slices holding `count` consecutive seconds starting at first_second.
+        size = len(self.buckets)
+        start = first_second % size
+        end = start + count
+        if end <= size:
+            return [slice(start, end)]
+        return [slice(start, size), slice(0, end - size)]
+
+    def add(self, count: int = 1, now: Optional[int] = None) -> None:
+        self._advance(int(time.time()) if now is None else now)
+        self.buckets[self.current_second % len(self.buckets)] += count
+        for index in range(len(self.windows)):
+            self.totals[index] += count
+
+    def counts(self, now: Optional[int] = None) -> Dict[int, int]:
+        self._advance(int(time.time()) if now is None else now)
+        return dict(zip(self.windows, self.totals))
+
+
+class LiveEngagementTracker:
+    """
+    Holds sliding-window counters per module and per user for the current process.
+
+    Only the `max_users` most recently active users are tracked; the least recently active user
+    is evicted when a new one arrives. Snapshots are shared: all streams reading within
+    MIN_INTERVAL_SECONDS of each other get the same one, so the per-user counters are read once
+    per tick however many clients are connected.
+    """
+
+    def __init__(self, windows: Tuple[int, ...], max_users: int) -> None:
+        self.windows = windows
+        self.max_users = max_users
+        self.modules: Dict[str, SlidingWindowCounter] = {}
+        self.users: "OrderedDict[str, SlidingWindowCounter]" = OrderedDict()
+        self.shared_snapshot: Optional[LiveEngagementSnapshot] = None
+        self.shared_snapshot_at = 0.0
+
+    def record(self, module_name: str, user_id: Optional[str] = None) -> None:
+        now = int(time.time())
+        counter = self.modules.get(module_name)
+        if counter is None:
+            counter = self.modules[module_name] = SlidingWindowCounter(
+                self.windows, now
+            )
+        counter.add(now=now)
+        if not user_id:
+            return
+        counter = self.users.get(user_id)
+        if counter is None:
+            if len(self.users) >= self.max_users:
+                self.users.popitem(last=False)
+            counter = self.users[user_id] = SlidingWindowCounter(self.windows, now)
+        else:
+            self.users.move_to_end(user_id)
+        counter.add(now=now)
+
+    def _rates(self, counter: SlidingWindowCounter, now: int) -> WindowRates:
+        counts = counter.counts(now)
+        return WindowRates(
+            counts={format_window(window): count for window, count in counts.items()},
+            rates_per_second={
+                format_window(window): count / window
+                for window, count in counts.items()
+            },
+        )
+
+    def _full_snapshot(self) -> LiveEngagementSnapshot:
+        now = int(time.time())
+        longest = max(self.windows)
+        users: List[Tuple[str, int]] = heapq.nlargest(
+            MAX_TOP_USERS,
+            (
+                (user_id, counter.counts(now)[longest])
+                for user_id, counter in self.users.items()
+            ),
+            key=lambda item: item[1],
+        )
+        return LiveEngagementSnapshot(
+            timestamp=time.time(),
+            modules={
+                module_name: self._rates(counter, now)
+                for module_name, counter in self.modules.items()
+            },
+            users={
+                user_id: self._rates(self.users[user_id], now)
+                for user_id, count in users
+                if count
+            },
+        )
+
+    def snapshot(self, top_users: int = 10) -> LiveEngagementSnapshot:
+        """
+        Returns the current rates per module and of the `top_users` most active users.
+        """
+        if (
+            self.shared_snapshot is None
+            or time.monotonic() - self.shared_snapshot_at >= MIN_INTERVAL_SECONDS
+        ):
+            self.shared_snapshot = self._full_snapshot()
+            self.shared_snapshot_at = time.monotonic()
+        return self.shared_snapshot.copy(
+            update={
+                "users": dict(islice(self.shared_snapshot.users.items(), top_users))
+            }
+        )
+
+
+def format_window(seconds: int) -> str:
+    """
+    Formats a window length as '30s', '5m' or '1h'.
+    """
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+
+tracker = LiveEngagementTracker(
+    project.config.LIVE_WINDOWS, project.config.LIVE_MAX_TRACKED_USERS
+)
+
+
+def record_interaction(module_name: str, user_id: Optional[str] = None) -> None:
+    """
+    Records one interaction with a module, optionally attributed to a user.
+
+    Args:
+        module_name (str): The ModuleName the interaction belongs to.
+        user_id (Optional[str]): The user that made the request, if known.
+    """
+    tracker.record(module_name, user_id)
+
+
+class LiveEngagementMiddleware:
+    """
+    Records every HTTP request as an interaction with the module of its route group.
+
+    The user is taken from the `X-User-Id` header or the `user_id` query parameter. Implemented
+    as a plain ASGI middleware so that request and response bodies pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, route_group_modules: Dict[str, str]) -> None:
+        self.app = app
+        self.route_group_modules = route_group_modules
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not scope["path"].startswith(
+            UNTRACKED_PATH_PREFIXES
+        ):
+            group = scope["path"].strip("/").split("/", 1)[0]
+            module_name = self.route_group_modules.get(group)
+            if module_name:
+                record_interaction(
+                    module_name,
+                    Headers(scope=scope).get("x-user-id")
+                    or QueryParams(scope["query_string"]).get("user_id"),
+                )
+        await self.app(scope, receive, send)
+
+
+async def live_engagement(
+    interval: float = 1.0, top_users: int = 10
+) -> AsyncIterator[LiveEngagementSnapshot]:
+    """
+    Yields a snapshot of the live interaction rates every `interval` seconds.
+
+    Rates are read from in-memory counters, so the stream never queries the database. Counters
+    are per process; with several workers each stream reflects the traffic of its own worker.
+
+    Args:
+        interval (float): Seconds between two snapshots, at least MIN_INTERVAL_SECONDS.
+        top_users (int): Number of most active users to include in each snapshot, at most
+            MAX_TOP_USERS.
+
+    Yields:
+        LiveEngagementSnapshot: Current interaction rates per module and for the most active users.
+    """
+    interval = max(interval, MIN_INTERVAL_SECONDS)
+    top_users = min(max(top_users, 0), MAX_TOP_USERS)
+    while True:
+        yield tracker.snapshot(top_users)
+        await asyncio.sleep(interval)
@@ -1,9 +1,6 @@
 from datetime import datetime
 from typing import List, Optional
 
-import prisma
-import prisma.enums
-import prisma.models
 from pydantic import BaseModel
 
 
@@ -18,6 +15,15 @@ class PredictiveInsight(BaseModel):
     recommendation: str
 
 
+class PredictiveAnalyticsRequest(BaseModel):
+    """
+    Request body for predictive analytics over an optional 'YYYY-MM-DD' date range.
+    """
+
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+
 class PredictiveAnalyticsResponse(BaseModel):
     """
     Response model for predictive analytics, detailing future user engagement and behavior trends.
@@ -32,8 +38,8 @@ async def predictive_analytics(
     """
     Offers predictive insights based on historical data and current trends.
 
-    This function simulates predictive analytics by analyzing user interaction data
-    and other relevant metrics from the database within the given date range to forecast future trends.
+    This function simulates predictive analytics: it returns forecast insights for the given date
+    range without reading the interactions of that range.
 
     Args:
         start_date (Optional[str]): The start date of the historical data range for analysis, in 'YYYY-MM-DD' format.
@@ -52,8 +58,9 @@ async def predictive_analytics(
         start_date = datetime.now().strftime("%Y-%m-%d")
     if not end_date:
         end_date = start_date
-    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+    # The insights do not depend on the interactions yet, so only the dates are validated.
+    datetime.strptime(start_date, "%Y-%m-%d")
+    datetime.strptime(end_date, "%Y-%m-%d")
     insights = [
         PredictiveInsight(
             trend="Increased use of NLP modules",
@@ -68,15 +75,4 @@ async def predictive_analytics(
             recommendation="Enhance scalability of the RealTimeAnalytics module.",
         ),
     ]
-    user_interactions = await prisma.models.UserModuleInteraction.prisma().find_many(
-        where={
-            "interactionAt": {"gte": start_dt, "lte": end_dt},
-            "moduleName": {
-                "in": [
-                    prisma.enums.ModuleName.NaturalLanguageProcessing,
-                    prisma.enums.ModuleName.RealTimeAnalytics,
-                ]
-            },
-        }
-    )
     return PredictiveAnalyticsResponse(predictions=insights)
@@ -0,0 +1,24 @@
+import gc
+import logging
+
+import project.config
+import project.entity_recognition_service
+
+logger = logging.getLogger(__name__)
+
+
+def preload_models() -> None:
+    """
+    Loads shared NLP models into the current process ahead of forking workers.
+
+    Called from the gunicorn master so that every worker inherits the loaded spaCy pipelines
+    through copy-on-write memory instead of loading its own copy. Objects alive at this point
+    are moved to the permanent GC generation so that collections in the workers do not touch
+    (and therefore copy) the pages they live on.
+    """
+    if "nlp" in project.config.ENABLED_ROUTE_GROUPS:
+        for lang_model in project.config.PRELOAD_SPACY_MODELS:
+            logger.info("Preloading spaCy pipeline '%s'", lang_model)
+            project.entity_recognition_service.load_pipeline(lang_model)
+    gc.collect()
+    gc.freeze()
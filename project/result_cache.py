@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+import project.config
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+# Models whose current version is tracked; the least recently used is forgotten beyond this.
+MAX_TRACKED_MODELS = 64
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Content-addressed cache of NLP responses for one service.
+
+    Entries are keyed by a hash of (service, model, model version, options, text) and stored as
+    JSON in an in-memory LRU bounded by `max_bytes`, with an optional on-disk tier shared by all
+    workers. Identical requests that arrive while a result is being computed wait for that
+    computation instead of starting their own. When the version of a model changes, its entries
+    are dropped from memory and its on-disk entries of older versions are deleted. On-disk paths
+    are built from hashes only, never from the model name or other request data.
+    """
+
+    def __init__(
+        self, service: str, max_bytes: int, disk_dir: Optional[str] = None
+    ) -> None:
+        self.service = service
+        self.max_bytes = max_bytes
+        self.disk_dir = os.path.join(disk_dir, service) if disk_dir else None
+        self.entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self.size = 0
+        self.versions: "OrderedDict[str, str]" = OrderedDict()
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, model: str, version: str, options: Dict[str, Any], text: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(
+            json.dumps([self.service, model, version, options], sort_keys=True).encode()
+        )
+        digest.update(b"\0")
+        digest.update(text.encode())
+        return digest.hexdigest()
+
+    def _version_dir(self, model: str, version: str) -> str:
+        return os.path.join(self.disk_dir, _digest(model), _digest(version))
+
+    def _set_version(self, model: str, version: str) -> None:
+        previous = self.versions.get(model)
+        if version == previous:
+            self.versions.move_to_end(model)
+            return
+        self.versions[model] = version
+        self.versions.move_to_end(model)
+        if len(self.versions) > MAX_TRACKED_MODELS:
+            self.versions.popitem(last=False)
+        if previous is not None:
+            logger.info(
+                "%s version changed from %s to %s; invalidating cached %s results",
+                model,
+                previous,
+                version,
+                self.service,
+            )
+            for key, (entry_model, value) in list(self.entries.items()):
+                if entry_model == model:
+                    del self.entries[key]
+                    self.size -= len(value)
+        if self.disk_dir:
+            model_dir = os.path.dirname(self._version_dir(model, version))
+            current = os.path.basename(self._version_dir(model, version))
+            if os.path.isdir(model_dir):
+                for name in os.listdir(model_dir):
+                    if name != current:
+                        shutil.rmtree(os.path.join(model_dir, name), ignore_errors=True)
+
+    def _remember(self, key: str, model: str, value: str) -> None:
+        if len(value) > self.max_bytes:
+            return
+        self.entries[key] = (model, value)
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def _read_disk(self, path: str) -> Optional[str]:
+        try:
+            with open(path, encoding="utf-8") as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, path: str, value: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(value)
+        os.replace(tmp_path, path)
+
+    def _compute_and_serialize(
+        self,
+        disk_path: Optional[str],
+        compute: Callable[[], ResponseModel],
+        should_cache: Callable[[ResponseModel], bool],
+    ) -> Tuple[str, bool]:
+        # Runs in a worker thread: checks the disk tier, computes on a miss and writes back.
+        if disk_path:
+            stored = self._read_disk(disk_path)
+            if stored is not None:
+                return stored, True
+        result = compute()
+        value = result.json()
+        cacheable = should_cache(result)
+        if disk_path and cacheable:
+            try:
+                self._write_disk(disk_path, value)
+            except OSError:
+                logger.exception("Could not write %s cache entry to disk", self.service)
+        return value, cacheable
+
+    async def get_or_compute(
+        self,
+        model: str,
+        version: str,
+        options: Dict[str, Any],
+        text: str,
+        compute: Callable[[], ResponseModel],
+        response_model: Type[ResponseModel],
+        should_cache: Callable[[ResponseModel], bool] = lambda result: True,
+    ) -> ResponseModel:
+        """
+        Returns the cached response for the request, computing it in a worker thread on a miss.
+
+        Args:
+            model (str): Name of the model or lexicon that produces the response.
+            version (str): Version of that model; a new version invalidates its cached results.
+            options (Dict[str, Any]): Any request parameters besides the text that affect the result.
+            text (str): The input text.
+            compute (Callable[[], ResponseModel]): Produces the response; only called on a miss.
+            response_model (Type[ResponseModel]): The pydantic model the response is parsed into.
+            should_cache (Callable[[ResponseModel], bool]): Whether a computed response may be cached.
+
+        Returns:
+            ResponseModel: The cached or freshly computed response.
+        """
+        self._set_version(model, version)
+        key = self._key(model, version, options, text)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return response_model.parse_raw(entry[1])
+        pending = self.in_flight.get(key)
+        if pending is not None:
+            self.hits += 1
+            return response_model.parse_raw(await asyncio.shield(pending))
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        disk_path = (
+            os.path.join(self._version_dir(model, version), key[:2], f"{key}.json")
+            if self.disk_dir
+            else None
+        )
+        try:
+            value, cacheable = await run_in_threadpool(
+                self._compute_and_serialize, disk_path, compute, should_cache
+            )
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting for it.
+            future.exception()
+            raise
+        finally:
+            del self.in_flight[key]
+        if cacheable and self.versions.get(model) == version:
+            self._remember(key, model, value)
+        future.set_result(value)
+        return response_model.parse_raw(value)
+
+
+sentiment_cache = ResultCache(
+    "sentiment",
+    project.config.NLP_CACHE_MAX_BYTES["sentiment"],
+    project.config.NLP_CACHE_DIR,
+)
+entity_cache = ResultCache(
+    "entities",
+    project.config.NLP_CACHE_MAX_BYTES["entities"],
+    project.config.NLP_CACHE_DIR,
+)
+translation_cache = ResultCache(
+    "translation",
+    project.config.NLP_CACHE_MAX_BYTES["translation"],
+    project.config.NLP_CACHE_DIR,
+)
@@ -1,5 +1,24 @@
+import hashlib
+import json
+
 from pydantic import BaseModel
 
+POSITIVE_WORDS = ("good", "great", "awesome", "happy", "joy", "pleased")
+NEGATIVE_WORDS = ("bad", "terrible", "horrible", "sad", "unhappy", "displeased")
+
+# Changes whenever either lexicon changes, invalidating cached sentiment results.
+LEXICON_VERSION = hashlib.sha256(
+    json.dumps([POSITIVE_WORDS, NEGATIVE_WORDS]).encode()
+).hexdigest()[:16]
+
+
+class SentimentAnalysisRequest(BaseModel):
+    """
+    Request body for sentiment analysis of a text.
+    """
+
+    text: str
+
 
 class SentimentAnalysisResponse(BaseModel):
     """
@@ -34,11 +53,9 @@ def sentiment_analysis(text: str) -> SentimentAnalysisResponse:
         sentiment_analysis("This is a terrible day")
         > SentimentAnalysisResponse(sentiment='negative', confidence=0.8)
     """
-    positive_words = ["good", "great", "awesome", "happy", "joy", "pleased"]
-    negative_words = ["bad", "terrible", "horrible", "sad", "unhappy", "displeased"]
-    text_words = text.lower().split()
-    positive_matches = sum((word in text_words for word in positive_words))
-    negative_matches = sum((word in text_words for word in negative_words))
+    text_words = set(text.lower().split())
+    positive_matches = sum((word in text_words for word in POSITIVE_WORDS))
+    negative_matches = sum((word in text_words for word in NEGATIVE_WORDS))
     if positive_matches > negative_matches:
         sentiment = "positive"
         confidence = min(1, 0.5 + 0.05 * positive_matches)
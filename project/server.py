@@ -1,21 +1,39 @@
+import codecs
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
+import project.approximate_analytics_service
+import project.compression
+import project.config
 import project.customize_endpoint_service
+import project.data_export_service
 import project.decrypt_data_service
 import project.encrypt_data_service
 import project.engagement_patterns_service
 import project.entity_recognition_service
+import project.feature_usage_service
 import project.integration_guide_service
+import project.job_queue_service
 import project.language_translation_service
+import project.live_engagement_service
 import project.predictive_analytics_service
+import project.result_cache
 import project.sentiment_analysis_service
 import project.user_behavior_service
-from fastapi import FastAPI
+from fastapi import (
+    APIRouter,
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from prisma import Prisma
 
 logger = logging.getLogger(__name__)
@@ -26,7 +44,13 @@ db_client = Prisma(auto_register=True)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await db_client.connect()
+    run_jobs = (
+        "jobs" in project.config.ENABLED_ROUTE_GROUPS and project.config.JOB_WORKERS > 0
+    )
+    if run_jobs:
+        await project.job_queue_service.pool.start()
     yield
+    await project.job_queue_service.pool.stop()
     await db_client.disconnect()
 
 
@@ -36,8 +60,95 @@ app = FastAPI(
     description="The Multi-Purpose API Toolkit presents an amalgam of essential tools that can be crucial for a wide range of applications, particularly for projects that require a diverse yet unified API approach. The toolkit encompasses a variety of functionalities aimed at simplifying common development tasks and enhancing application capabilities without the need for integrating several third-party services. Key features identified as particularly valuable include the Natural Language Processing (NLP) module for its ability to transform unstructured data into actionable insights and to improve user interaction through advanced analytics and scalability.\n\nThe requirements and expectations detailed emphasize the importance of scalability to manage growth efficiently, user engagement to foster increased interaction, and advanced analytics for in-depth user behavior insights. These reflect a strategic focus on not only meeting current user needs but anticipating future demands, ensuring the product's continuous evolution and relevance. The integration best practices for employing third-party APIs within a Python FastAPI application, alongside securing sensitive data in PostgreSQL when utilizing Prisma ORM, define a technical roadmap aiming to maintain high performance, security, and modularity. This technical framework highlights asynchronous API calls, robust error handling, environmental variables for sensitive information, caching strategies, and regular security reviews as critical components for a sustainable, secure, and scalable application.\n\nGiven the toolkit’s broad utility, attention to integrating advanced analytics, and real-time analytics capabilities is advised. These enhancements would support the prioritized needs for detailed user engagement data and predictive modeling capabilities, setting a strong foundation for tailored development strategies and informed decision making.",
 )
 
+ROUTE_GROUP_MODULES = {
+    "nlp": "NaturalLanguageProcessing",
+    "analytics": "RealTimeAnalytics",
+    "datasecurity": "DataProtection",
+    "integration": "APIIntegrationSupport",
+}
+
+
+app.add_middleware(
+    project.live_engagement_service.LiveEngagementMiddleware,
+    route_group_modules=ROUTE_GROUP_MODULES,
+)
+app.add_middleware(
+    project.compression.RequestDecompressionMiddleware,
+    max_body_size=project.config.MAX_REQUEST_BODY_BYTES,
+)
+app.add_middleware(
+    project.compression.ResponseCompressionMiddleware,
+    minimum_size=project.config.COMPRESSION_MINIMUM_SIZE,
+)
+
+
+async def read_text_body(request: Request) -> str:
+    """
+    Reads a UTF-8 request body chunk by chunk as it arrives.
+
+    Raises:
+        HTTPException: 400 if the body is not valid UTF-8.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        parts = [decoder.decode(chunk) async for chunk in request.stream()]
+        parts.append(decoder.decode(b"", final=True))
+    except UnicodeDecodeError as e:
+        raise HTTPException(400, f"Request body is not valid UTF-8: {e}") from e
+    return "".join(parts)
+
+
+async def cached_sentiment_analysis(
+    text: str,
+) -> project.sentiment_analysis_service.SentimentAnalysisResponse:
+    return await project.result_cache.sentiment_cache.get_or_compute(
+        "lexicon",
+        project.sentiment_analysis_service.LEXICON_VERSION,
+        {},
+        text,
+        lambda: project.sentiment_analysis_service.sentiment_analysis(text),
+        project.sentiment_analysis_service.SentimentAnalysisResponse,
+    )
+
+
+async def cached_language_translation(
+    source_text: str, source_language: str, target_language: str
+) -> project.language_translation_service.LanguageTranslationResponse:
+    return await project.result_cache.translation_cache.get_or_compute(
+        project.language_translation_service.TRANSLATION_MODEL,
+        project.language_translation_service.translation_version(),
+        {"source_language": source_language, "target_language": target_language},
+        source_text,
+        lambda: project.language_translation_service.language_translation(
+            source_text, source_language, target_language
+        ),
+        project.language_translation_service.LanguageTranslationResponse,
+        should_cache=lambda result: result.status == "success",
+    )
+
 
-@app.post(
+async def cached_entity_recognition(
+    text: str, language: Optional[str]
+) -> project.entity_recognition_service.EntityRecognitionResponse:
+    lang_model = project.entity_recognition_service.pipeline_name(language)
+    return await project.result_cache.entity_cache.get_or_compute(
+        lang_model,
+        project.entity_recognition_service.pipeline_version(lang_model),
+        {},
+        text,
+        lambda: project.entity_recognition_service.entity_recognition(text, language),
+        project.entity_recognition_service.EntityRecognitionResponse,
+    )
+
+
+nlp_router = APIRouter(tags=["nlp"])
+analytics_router = APIRouter(tags=["analytics"])
+integration_router = APIRouter(tags=["integration"])
+datasecurity_router = APIRouter(tags=["datasecurity"])
+jobs_router = APIRouter(tags=["jobs"])
+
+
+@nlp_router.post(
     "/nlp/sentiment-analysis",
     response_model=project.sentiment_analysis_service.SentimentAnalysisResponse,
 )
@@ -48,7 +159,7 @@ async def api_post_sentiment_analysis(
     Analyzes input text to determine sentiment.
     """
     try:
-        res = project.sentiment_analysis_service.sentiment_analysis(text)
+        res = await cached_sentiment_analysis(text)
         return res
     except Exception as e:
         logger.exception("Error processing request")
@@ -61,7 +172,7 @@ async def api_post_sentiment_analysis(
         )
 
 
-@app.post(
+@integration_router.post(
     "/integration/customize",
     response_model=project.customize_endpoint_service.CustomizeEndpointResponse,
 )
@@ -90,7 +201,7 @@ async def api_post_customize_endpoint(
         )
 
 
-@app.post(
+@nlp_router.post(
     "/nlp/language-translation",
     response_model=project.language_translation_service.LanguageTranslationResponse,
 )
@@ -101,7 +212,7 @@ async def api_post_language_translation(
     Translates text from a source language to a target language.
     """
     try:
-        res = project.language_translation_service.language_translation(
+        res = await cached_language_translation(
             source_text, source_language, target_language
         )
         return res
@@ -116,7 +227,7 @@ async def api_post_language_translation(
         )
 
 
-@app.get(
+@analytics_router.get(
     "/analytics/predictive",
     response_model=project.predictive_analytics_service.PredictiveAnalyticsResponse,
 )
@@ -142,7 +253,7 @@ async def api_get_predictive_analytics(
         )
 
 
-@app.get(
+@analytics_router.get(
     "/analytics/user-behavior",
     response_model=project.user_behavior_service.UserBehaviorResponse,
 )
@@ -168,7 +279,7 @@ async def api_get_user_behavior(
         )
 
 
-@app.get(
+@integration_router.get(
     "/integration/guide",
     response_model=project.integration_guide_service.IntegrationGuideResponse,
 )
@@ -192,20 +303,28 @@ async def api_get_integration_guide(
         )
 
 
-@app.get(
+@analytics_router.get(
     "/analytics/engagement-patterns",
     response_model=project.engagement_patterns_service.EngagementPatternsResponse,
 )
 async def api_get_engagement_patterns(
-    start_date: datetime, end_date: datetime, segment: Optional[str]
+    start_date: datetime,
+    end_date: datetime,
+    segment: Optional[str],
+    approx: bool = False,
 ) -> project.engagement_patterns_service.EngagementPatternsResponse | Response:
     """
     Analyzes engagement patterns to offer insights for UX improvement.
     """
     try:
-        res = await project.engagement_patterns_service.engagement_patterns(
-            start_date, end_date, segment
-        )
+        if approx:
+            res = await project.approximate_analytics_service.approximate_engagement_patterns(
+                start_date, end_date, segment
+            )
+        else:
+            res = await project.engagement_patterns_service.engagement_patterns(
+                start_date, end_date, segment
+            )
         return res
     except Exception as e:
         logger.exception("Error processing request")
@@ -218,7 +337,7 @@ async def api_get_engagement_patterns(
         )
 
 
-@app.post(
+@nlp_router.post(
     "/nlp/entity-recognition",
     response_model=project.entity_recognition_service.EntityRecognitionResponse,
 )
@@ -229,7 +348,7 @@ async def api_post_entity_recognition(
     Identifies key entities within the input text.
     """
     try:
-        res = project.entity_recognition_service.entity_recognition(text, language)
+        res = await cached_entity_recognition(text, language)
         return res
     except Exception as e:
         logger.exception("Error processing request")
@@ -242,7 +361,7 @@ async def api_post_entity_recognition(
         )
 
 
-@app.post(
+@datasecurity_router.post(
     "/datasecurity/decrypt",
     response_model=project.decrypt_data_service.DecryptDataResponse,
 )
@@ -266,7 +385,7 @@ async def api_post_decrypt_data(
         )
 
 
-@app.post(
+@datasecurity_router.post(
     "/datasecurity/encrypt",
     response_model=project.encrypt_data_service.EncryptDataResponse,
 )
@@ -288,3 +407,447 @@ async def api_post_encrypt_data(
             status_code=500,
             media_type="application/json",
         )
+
+
+@analytics_router.get("/analytics/export/{dataset}")
+async def api_get_export_data(
+    dataset: str,
+    start_date: datetime,
+    end_date: datetime,
+    export_format: str = "ndjson",
+    cursor: Optional[str] = None,
+    accept_encoding: Optional[str] = Header(None),
+) -> Response:
+    """
+    Streams raw interactions, analytics events or feature usage records for a date range.
+    """
+    try:
+        compress = "gzip" in (accept_encoding or "")
+        chunks = await project.data_export_service.export_data(
+            dataset, start_date, end_date, export_format, cursor, compress
+        )
+        return StreamingResponse(
+            chunks,
+            media_type=project.data_export_service.EXPORT_MEDIA_TYPES[export_format],
+            headers={"Content-Encoding": "gzip"} if compress else None,
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@analytics_router.get(
+    "/analytics/feature-usage",
+    response_model=project.feature_usage_service.FeatureUsageResponse,
+)
+async def api_get_feature_usage(
+    start_date: datetime,
+    end_date: datetime,
+    bucket: str = "day",
+    feature_id: Optional[str] = None,
+    details_filter: Optional[str] = None,
+    top_users: int = 5,
+) -> project.feature_usage_service.FeatureUsageResponse | Response:
+    """
+    Reports per-feature usage counts, time buckets and top users.
+    """
+    try:
+        res = await project.feature_usage_service.feature_usage(
+            start_date, end_date, bucket, feature_id, details_filter, top_users
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@analytics_router.get("/analytics/live")
+async def api_get_live_engagement(
+    interval: float = Query(
+        1.0, ge=project.live_engagement_service.MIN_INTERVAL_SECONDS
+    ),
+    top_users: int = Query(10, ge=0, le=project.live_engagement_service.MAX_TOP_USERS),
+) -> StreamingResponse:
+    """
+    Streams live per-module and per-user interaction rates as server-sent events.
+    """
+
+    async def events():
+        async for snapshot in project.live_engagement_service.live_engagement(
+            interval, top_users
+        ):
+            yield f"data: {snapshot.json()}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@analytics_router.websocket("/analytics/live/ws")
+async def api_ws_live_engagement(
+    websocket: WebSocket,
+    interval: float = Query(
+        1.0, ge=project.live_engagement_service.MIN_INTERVAL_SECONDS
+    ),
+    top_users: int = Query(10, ge=0, le=project.live_engagement_service.MAX_TOP_USERS),
+) -> None:
+    """
+    Pushes live per-module and per-user interaction rates over a WebSocket.
+    """
+    await websocket.accept()
+    try:
+        async for snapshot in project.live_engagement_service.live_engagement(
+            interval, top_users
+        ):
+            await websocket.send_text(snapshot.json())
+    except WebSocketDisconnect:
+        pass
+
+
+@nlp_router.post(
+    "/nlp/sentiment-analysis/json",
+    response_model=project.sentiment_analysis_service.SentimentAnalysisResponse,
+)
+async def api_post_sentiment_analysis_json(
+    body: project.sentiment_analysis_service.SentimentAnalysisRequest,
+) -> project.sentiment_analysis_service.SentimentAnalysisResponse | Response:
+    """
+    Analyzes the sentiment of a text sent as a JSON request body.
+    """
+    try:
+        res = await cached_sentiment_analysis(body.text)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@nlp_router.post(
+    "/nlp/sentiment-analysis/raw",
+    response_model=project.sentiment_analysis_service.SentimentAnalysisResponse,
+)
+async def api_post_sentiment_analysis_raw(
+    request: Request,
+) -> project.sentiment_analysis_service.SentimentAnalysisResponse | Response:
+    """
+    Analyzes the sentiment of a text sent as the raw UTF-8 request body.
+    """
+    text = await read_text_body(request)
+    try:
+        res = await cached_sentiment_analysis(text)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@nlp_router.post(
+    "/nlp/language-translation/json",
+    response_model=project.language_translation_service.LanguageTranslationResponse,
+)
+async def api_post_language_translation_json(
+    body: project.language_translation_service.LanguageTranslationRequest,
+) -> project.language_translation_service.LanguageTranslationResponse | Response:
+    """
+    Translates a text sent as a JSON request body.
+    """
+    try:
+        res = await cached_language_translation(
+            body.source_text, body.source_language, body.target_language
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@nlp_router.post(
+    "/nlp/language-translation/raw",
+    response_model=project.language_translation_service.LanguageTranslationResponse,
+)
+async def api_post_language_translation_raw(
+    request: Request,
+    source_language: str,
+    target_language: str,
+) -> project.language_translation_service.LanguageTranslationResponse | Response:
+    """
+    Translates a text sent as the raw UTF-8 request body.
+    """
+    source_text = await read_text_body(request)
+    try:
+        res = await cached_language_translation(
+            source_text, source_language, target_language
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@nlp_router.post(
+    "/nlp/entity-recognition/json",
+    response_model=project.entity_recognition_service.EntityRecognitionResponse,
+)
+async def api_post_entity_recognition_json(
+    body: project.entity_recognition_service.EntityRecognitionRequest,
+) -> project.entity_recognition_service.EntityRecognitionResponse | Response:
+    """
+    Identifies key entities within a text sent as a JSON request body.
+    """
+    try:
+        res = await cached_entity_recognition(body.text, body.language)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@nlp_router.post(
+    "/nlp/entity-recognition/raw",
+    response_model=project.entity_recognition_service.EntityRecognitionResponse,
+)
+async def api_post_entity_recognition_raw(
+    request: Request,
+    language: Optional[str] = None,
+) -> project.entity_recognition_service.EntityRecognitionResponse | Response:
+    """
+    Identifies key entities within a text sent as the raw UTF-8 request body.
+    """
+    text = await read_text_body(request)
+    try:
+        res = await cached_entity_recognition(text, language)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@datasecurity_router.post(
+    "/datasecurity/decrypt/json",
+    response_model=project.decrypt_data_service.DecryptDataResponse,
+)
+async def api_post_decrypt_data_json(
+    body: project.decrypt_data_service.DecryptDataRequest,
+) -> project.decrypt_data_service.DecryptDataResponse | Response:
+    """
+    Decrypts encrypted data sent as a JSON request body.
+    """
+    try:
+        res = project.decrypt_data_service.decrypt_data(
+            body.encrypted_data, body.decryption_key
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@datasecurity_router.post(
+    "/datasecurity/decrypt/raw",
+    response_model=project.decrypt_data_service.DecryptDataResponse,
+)
+async def api_post_decrypt_data_raw(
+    request: Request,
+    decryption_key: Optional[str] = None,
+) -> project.decrypt_data_service.DecryptDataResponse | Response:
+    """
+    Decrypts encrypted data sent as the raw UTF-8 request body.
+    """
+    encrypted_data = await read_text_body(request)
+    try:
+        res = project.decrypt_data_service.decrypt_data(encrypted_data, decryption_key)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@datasecurity_router.post(
+    "/datasecurity/encrypt/json",
+    response_model=project.encrypt_data_service.EncryptDataResponse,
+)
+async def api_post_encrypt_data_json(
+    body: project.encrypt_data_service.EncryptDataRequest,
+) -> project.encrypt_data_service.EncryptDataResponse | Response:
+    """
+    Encrypts data sent as a JSON request body.
+    """
+    try:
+        res = project.encrypt_data_service.encrypt_data(
+            body.data, body.encryption_schema
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@datasecurity_router.post(
+    "/datasecurity/encrypt/raw",
+    response_model=project.encrypt_data_service.EncryptDataResponse,
+)
+async def api_post_encrypt_data_raw(
+    request: Request,
+    encryption_schema: Optional[str] = None,
+) -> project.encrypt_data_service.EncryptDataResponse | Response:
+    """
+    Encrypts data sent as the raw UTF-8 request body.
+    """
+    data = await read_text_body(request)
+    try:
+        res = project.encrypt_data_service.encrypt_data(data, encryption_schema)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@jobs_router.post(
+    "/jobs/{job_type}", response_model=project.job_queue_service.JobStatusResponse
+)
+async def api_post_submit_job(
+    job_type: str, params: Dict[str, Any], priority: int = 0
+) -> project.job_queue_service.JobStatusResponse | Response:
+    """
+    Queues an encryption, entity recognition, batch translation or predictive analytics job.
+    """
+    try:
+        res = await project.job_queue_service.submit_job(job_type, params, priority)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@jobs_router.get(
+    "/jobs/{job_id}", response_model=project.job_queue_service.JobStatusResponse
+)
+async def api_get_job_status(
+    job_id: str,
+) -> project.job_queue_service.JobStatusResponse | Response:
+    """
+    Returns the current state of a background job.
+    """
+    try:
+        res = await project.job_queue_service.job_status(job_id)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@jobs_router.get(
+    "/jobs/{job_id}/result",
+    response_model=project.job_queue_service.JobResultResponse,
+)
+async def api_get_job_result(
+    job_id: str,
+) -> project.job_queue_service.JobResultResponse | Response:
+    """
+    Returns the result of a background job once it has finished.
+    """
+    try:
+        res = await project.job_queue_service.job_result(job_id)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+for group, router in (
+    ("nlp", nlp_router),
+    ("analytics", analytics_router),
+    ("integration", integration_router),
+    ("datasecurity", datasecurity_router),
+    ("jobs", jobs_router),
+):
+    if group in project.config.ENABLED_ROUTE_GROUPS:
+        app.include_router(router)
@@ -0,0 +1,163 @@
+import hashlib
+import math
+import sys
+from array import array
+from typing import Dict, Iterable, Optional
+
+
+def hash64(value: str) -> int:
+    """
+    Returns a stable 64-bit hash of a string, identical across processes and restarts.
+    """
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+    )
+
+
+class HyperLogLog:
+    """
+    Estimates the number of distinct items added, using 2**precision one-byte registers.
+
+    The relative standard error of the estimate is 1.04 / sqrt(2**precision), and two sketches
+    with the same precision are merged by taking the register-wise maximum. Merging and
+    estimating are vectorized with NumPy, imported on first use so that workers which never
+    serve approximate queries do not pay its import cost at startup.
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = 12, registers: Optional[bytes] = None) -> None:
+        self.precision = precision
+        self.registers = bytearray(registers or bytes(1 << precision))
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value: str) -> None:
+        hashed = hash64(value)
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        import numpy as np
+
+        registers = np.frombuffer(self.registers, dtype=np.uint8)
+        np.maximum(
+            registers, np.frombuffer(other.registers, dtype=np.uint8), out=registers
+        )
+
+    def estimate(self) -> int:
+        import numpy as np
+
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        registers = np.frombuffer(self.registers, dtype=np.uint8)
+        raw = alpha * m * m / float(np.exp2(-registers.astype(np.float64)).sum())
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+
+class CountMinSketch:
+    """
+    Estimates per-key counts in a fixed `depth` x `width` table of 32-bit counters.
+
+    Estimates never undercount; with probability 1 - e**-depth they overcount by at most
+    e / width times the total of all counts. Sketches of the same shape merge by addition.
+    """
+
+    __slots__ = ("width", "depth", "total", "counters")
+
+    def __init__(
+        self,
+        width: int = 2048,
+        depth: int = 4,
+        total: int = 0,
+        counters: Optional[bytes] = None,
+    ) -> None:
+        self.width = width
+        self.depth = depth
+        self.total = total
+        self.counters = array("I")
+        if counters:
+            self.counters.frombytes(counters)
+            if sys.byteorder == "big":
+                self.counters.byteswap()
+        else:
+            self.counters.frombytes(bytes(4 * width * depth))
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.width
+
+    @property
+    def confidence(self) -> float:
+        return 1 - math.exp(-self.depth)
+
+    def _indexes(self, key: str) -> Iterable[int]:
+        hashed = hash64(key)
+        low, high = hashed & 0xFFFFFFFF, hashed >> 32
+        for row in range(self.depth):
+            yield row * self.width + (low + row * high) % self.width
+
+    def add(self, key: str, count: int = 1) -> None:
+        self.total += count
+        for index in self._indexes(key):
+            self.counters[index] += count
+
+    def estimate(self, key: str) -> int:
+        return min(self.counters[index] for index in self._indexes(key))
+
+    def error_bound(self) -> float:
+        return self.epsilon * self.total
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge CountMinSketch sketches of different shape")
+        import numpy as np
+
+        counters = np.frombuffer(self.counters, dtype=np.uint32)
+        summed = counters.astype(np.uint64) + np.frombuffer(
+            other.counters, dtype=np.uint32
+        )
+        if summed.max(initial=0) > np.iinfo(np.uint32).max:
+            raise OverflowError("CountMinSketch counter exceeds 32 bits")
+        counters[:] = summed
+        self.total += other.total
+
+    def to_bytes(self) -> bytes:
+        counters = array("I", self.counters)
+        if sys.byteorder == "big":
+            counters.byteswap()
+        return counters.tobytes()
+
+
+def top_k(sketch: CountMinSketch, candidates: Iterable[str], k: int) -> Dict[str, int]:
+    """
+    Ranks candidate keys by their count-min estimate and keeps the k heaviest.
+
+    Args:
+        sketch (CountMinSketch): The sketch the candidates were counted in.
+        candidates (Iterable[str]): Keys that may be heavy hitters, e.g. the union of the
+            top-k lists of the sketches merged into `sketch`.
+        k (int): Number of keys to keep.
+
+    Returns:
+        Dict[str, int]: Up to k keys and their estimated counts, heaviest first.
+    """
+    estimates = sorted(
+        ((key, sketch.estimate(key)) for key in set(candidates)),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return dict(estimates[:k])
@@ -0,0 +1,90 @@
+"""
+Reports how long it takes to import the API server and where that time goes.
+
+Usage:
+    ENABLED_ROUTE_GROUPS=analytics python -m project.startup_report --budget 1.0
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+def measure_imports(target: str) -> List[Tuple[str, int, int]]:
+    """
+    Imports the target module in a fresh interpreter with `-X importtime` enabled.
+
+    Args:
+        target (str): Dotted path of the module to import, e.g. 'project.server'.
+
+    Returns:
+        List[Tuple[str, int, int]]: (module name, self time in us, cumulative time in us) per imported module.
+
+    Raises:
+        RuntimeError: If the target module cannot be imported.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing '{target}' failed:\n{completed.stderr}")
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def summarize(timings: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """
+    Sums self time per top-level package, keeping project modules separate.
+
+    Args:
+        timings (List[Tuple[str, int, int]]): Output of measure_imports.
+
+    Returns:
+        Dict[str, int]: Self time in microseconds keyed by package or project module.
+    """
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in timings:
+        key = name if name.startswith("project.") else name.split(".")[0]
+        totals[key] += self_us
+    return dict(totals)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", default="project.server")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        help="Fail with exit code 1 if the total import time exceeds this many seconds.",
+    )
+    args = parser.parse_args()
+    timings = measure_imports(args.target)
+    total_us = sum(self_us for _, self_us, _ in timings)
+    groups = os.getenv("ENABLED_ROUTE_GROUPS") or "all"
+    print(f"Import of {args.target} (route groups: {groups}): {total_us / 1e6:.3f}s")
+    print(f"{'seconds':>9}  {'share':>6}  package")
+    for name, self_us in sorted(
+        summarize(timings).items(), key=lambda item: item[1], reverse=True
+    )[: args.top]:
+        print(f"{self_us / 1e6:9.3f}  {self_us / total_us:6.1%}  {name}")
+    if args.budget is not None and total_us / 1e6 > args.budget:
+        print(f"Startup budget of {args.budget:.3f}s exceeded")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,18 @@
 from collections import Counter
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List
 
 import prisma
-import prisma.models
+import project.config
 from pydantic import BaseModel
 
+TIME_SLOTS = {
+    range(0, 6): "Midnight 12AM - 6AM",
+    range(6, 12): "Morning 6AM - 12PM",
+    range(12, 18): "Afternoon 12PM - 6PM",
+    range(18, 24): "Evening 6PM - 12AM",
+}
+
 
 class UserBehaviorResponse(BaseModel):
     """
@@ -18,6 +25,25 @@ class UserBehaviorResponse(BaseModel):
     top_interactions: List[str]
 
 
+def time_slot_for_hour(hour: int) -> str:
+    """
+    Maps an hour of the day to the name of the time slot containing it.
+    """
+    return next(
+        (slot for time_range, slot in TIME_SLOTS.items() if hour in time_range),
+        "Unknown",
+    )
+
+
+def _utc_timestamp(value: datetime) -> str:
+    """
+    Formats a datetime as a UTC timestamp literal, treating naive datetimes as UTC like Prisma does.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
 async def user_behavior(
     user_id: str, start_date: datetime, end_date: datetime
 ) -> UserBehaviorResponse:
@@ -26,6 +52,8 @@ async def user_behavior(
 
     This function fetches interactions and analytics data for a specific user within a provided time period and
     computes metrics such as the total interaction count, most active time slot, and top interaction types.
+    The interactions are counted per module and hour in a single aggregate query on the
+    (userId, interactionAt) index, so no interaction rows are transferred.
 
     Args:
         user_id (str): Unique identifier for the user to fetch analytics for.
@@ -42,53 +70,72 @@ async def user_behavior(
         user_behavior_data = await user_behavior(user_id, start_date, end_date)
         print(user_behavior_data)
     """
-    interactions = await prisma.models.UserModuleInteraction.prisma().find_many(
-        where={"userId": user_id, "interactionAt": {"gte": start_date, "lte": end_date}}
-    )
-    interaction_counts = Counter(
-        [interaction.moduleName for interaction in interactions]
+    if project.config.COLUMNAR_ANALYTICS:
+        from project.columnar_analytics import store
+
+        if store.covers(start_date):
+            return await columnar_user_behavior(user_id, start_date, end_date)
+    rows = await prisma.get_client().query_raw(
+        """
+        SELECT "moduleName"::text AS module_name,
+               EXTRACT(HOUR FROM "interactionAt")::int AS hour,
+               COUNT(*)::int AS interaction_count
+        FROM "UserModuleInteraction"
+        WHERE "userId" = $1
+          AND "interactionAt" >= $2::timestamp AND "interactionAt" <= $3::timestamp
+        GROUP BY "moduleName", hour
+        """,
+        user_id,
+        _utc_timestamp(start_date),
+        _utc_timestamp(end_date),
     )
-    total_interactions = sum(interaction_counts.values())
-    if not interactions:
+    if not rows:
         return UserBehaviorResponse(
             user_id=user_id,
             overall_interaction_count=0,
             most_active_time_slot="No interaction in the period",
             top_interactions=[],
         )
-    time_slots = {
-        interaction.interactionAt.hour: interaction for interaction in interactions
-    }
-    most_active_hour = max(
-        time_slots,
-        key=lambda hour: sum(
-            (
-                1
-                for interaction in interactions
-                if interaction.interactionAt.hour == hour
-            )
-        ),
-    )
-    time_slot_mapping = {
-        range(0, 6): "Midnight 12AM - 6AM",
-        range(6, 12): "Morning 6AM - 12PM",
-        range(12, 18): "Afternoon 12PM - 6PM",
-        range(18, 24): "Evening 6PM - 12AM",
-    }
-    most_active_time_slot = next(
-        (
-            slot
-            for time_range, slot in time_slot_mapping.items()
-            if most_active_hour in time_range
-        ),
-        "Unknown",
+    module_counts: Counter = Counter()
+    hour_counts: Counter = Counter()
+    for row in rows:
+        module_counts[row["module_name"]] += row["interaction_count"]
+        hour_counts[row["hour"]] += row["interaction_count"]
+    return UserBehaviorResponse(
+        user_id=user_id,
+        overall_interaction_count=sum(module_counts.values()),
+        most_active_time_slot=time_slot_for_hour(hour_counts.most_common(1)[0][0]),
+        top_interactions=[module for module, count in module_counts.most_common(3)],
     )
-    top_interactions = [
-        interaction for interaction, count in interaction_counts.most_common(3)
-    ]
+
+
+async def columnar_user_behavior(
+    user_id: str, start_date: datetime, end_date: datetime
+) -> UserBehaviorResponse:
+    """
+    Computes the same metrics as user_behavior from the in-memory columnar interaction store.
+
+    Args:
+        user_id (str): Unique identifier for the user to fetch analytics for.
+        start_date (datetime): The starting date for the period to retrieve analytics.
+        end_date (datetime): The ending date for the period to retrieve analytics.
+
+    Returns:
+        UserBehaviorResponse: Response model containing analyzed data of user behavior.
+    """
+    from project.columnar_analytics import store
+
+    frame = await store.frame(start_date, end_date, user_id=user_id)
+    if not len(frame):
+        return UserBehaviorResponse(
+            user_id=user_id,
+            overall_interaction_count=0,
+            most_active_time_slot="No interaction in the period",
+            top_interactions=[],
+        )
     return UserBehaviorResponse(
         user_id=user_id,
-        overall_interaction_count=total_interactions,
-        most_active_time_slot=most_active_time_slot,
-        top_interactions=top_interactions,
+        overall_interaction_count=len(frame),
+        most_active_time_slot=time_slot_for_hour(int(frame.hour_histogram().argmax())),
+        top_interactions=frame.top_modules(3),
     )
@@ -0,0 +1,154 @@
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from project.columnar_analytics import (
+    MODULE_NAMES,
+    MS_PER_DAY,
+    ROLE_NAMES,
+    InteractionColumns,
+    InteractionStore,
+    epoch_ms,
+)
+
+
+class InteractionColumnsTest(unittest.TestCase):
+    def test_set_roles_grows_past_initial_capacity(self):
+        columns = InteractionColumns(capacity=4)
+        user_ids = [f"user-{index}" for index in range(10)]
+        roles = [ROLE_NAMES[index % len(ROLE_NAMES)] for index in range(10)]
+        columns.set_roles(user_ids, roles)
+        columns.append(user_ids, [MODULE_NAMES[0]] * 10, list(range(10)))
+        frame = columns.select(0, 9, role=ROLE_NAMES[0])
+        self.assertEqual(
+            len(frame), len([role for role in roles if role == ROLE_NAMES[0]])
+        )
+
+    def test_set_roles_with_more_users_than_default_capacity(self):
+        columns = InteractionColumns()
+        user_ids = [f"user-{index}" for index in range(3000)]
+        columns.set_roles(user_ids, [ROLE_NAMES[0]] * len(user_ids))
+        self.assertEqual(len(columns.user_ids), 3000)
+        self.assertTrue((columns.user_roles[:3000] == 0).all())
+
+    def test_append_keeps_rows_sorted(self):
+        columns = InteractionColumns(capacity=2)
+        columns.append(["a", "b", "c"], [MODULE_NAMES[0]] * 3, [30, 10, 20])
+        columns.append(["d"], [MODULE_NAMES[1]], [15])
+        self.assertEqual(columns.timestamps.tolist(), [10, 15, 20, 30])
+        self.assertEqual(
+            [columns.user_ids[code] for code in columns.users], ["b", "d", "c", "a"]
+        )
+
+    def test_insert_merges_older_rows(self):
+        rng = random.Random(3)
+        columns = InteractionColumns(capacity=8)
+        expected = []
+        for batch in range(30):
+            timestamps = [rng.randint(0, 1000) for _ in range(rng.randint(1, 40))]
+            users = [f"user-{batch}-{index}" for index in range(len(timestamps))]
+            columns.append(users, [MODULE_NAMES[0]] * len(users), timestamps)
+            expected = sorted(
+                expected + list(zip(timestamps, users)), key=lambda row: row[0]
+            )
+        self.assertEqual(columns.timestamps.tolist(), [ms for ms, _ in expected])
+        self.assertEqual(
+            [columns.user_ids[code] for code in columns.users],
+            [user for _, user in expected],
+        )
+
+    def test_evict_before(self):
+        columns = InteractionColumns()
+        columns.append(["a", "b", "c"], [MODULE_NAMES[0]] * 3, [10, 20, 30])
+        columns.evict_before(20)
+        self.assertEqual(columns.timestamps.tolist(), [20, 30])
+        self.assertEqual(len(columns.select(0, 100, user_id="a")), 0)
+        self.assertEqual(len(columns.select(0, 100, user_id="c")), 1)
+
+
+class FakeStore(InteractionStore):
+    def __init__(self, rows, fail_after_pages=None):
+        super().__init__(refresh_seconds=3600, retention_days=30, page_size=2)
+        self.rows = rows
+        self.fail_after_pages = fail_after_pages
+        self.pages = 0
+
+    async def _fetch(self, after, before_ms):
+        if self.fail_after_pages is not None and self.pages >= self.fail_after_pages:
+            raise ConnectionError("database went away")
+        self.pages += 1
+        rows = [
+            row
+            for row in self.rows
+            if (row["interaction_ms"], row["id"]) > after
+            and (before_ms is None or row["interaction_ms"] < before_ms)
+        ]
+        return sorted(rows, key=lambda row: (row["interaction_ms"], row["id"]))[
+            : self.page_size
+        ]
+
+
+def make_rows(start: datetime, days: int):
+    return [
+        {
+            "id": f"row-{day}",
+            "user_id": f"user-{day % 3}",
+            "module_name": MODULE_NAMES[day % len(MODULE_NAMES)],
+            "interaction_ms": epoch_ms(start + timedelta(days=day)),
+            "role": ROLE_NAMES[0],
+        }
+        for day in range(days)
+    ]
+
+
+class InteractionStoreTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.now = datetime.now(timezone.utc)
+        self.start = self.now - timedelta(days=20)
+        self.rows = make_rows(self.start, 10)
+
+    async def test_failed_initial_load_leaves_store_unloaded(self):
+        store = FakeStore(self.rows, fail_after_pages=2)
+        with self.assertRaises(ConnectionError):
+            await store.frame(self.start, self.now)
+        self.assertIsNone(store.loaded_from_ms)
+        store.fail_after_pages = None
+        frame = await store.frame(self.start, self.now)
+        self.assertEqual(len(frame), 10)
+
+    async def test_failed_backfill_keeps_loaded_window(self):
+        store = FakeStore(self.rows)
+        middle = self.start + timedelta(days=5)
+        self.assertEqual(len(await store.frame(middle, self.now)), 5)
+        loaded_from_ms = store.loaded_from_ms
+        store.pages, store.fail_after_pages = 0, 1
+        with self.assertRaises(ConnectionError):
+            await store.frame(self.start, self.now)
+        self.assertEqual(store.loaded_from_ms, loaded_from_ms)
+        self.assertEqual(store.columns.size, 5)
+        store.fail_after_pages = None
+        self.assertEqual(len(await store.frame(self.start, self.now)), 10)
+
+    async def test_backfill_is_inserted_once(self):
+        store = FakeStore(self.rows)
+        await store.frame(self.start + timedelta(days=5), self.now)
+        inserts = []
+        insert = store.columns.insert
+        store.columns.insert = lambda *columns: inserts.append(1) or insert(*columns)
+        self.assertEqual(len(await store.frame(self.start, self.now)), 10)
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            store.columns.timestamps.tolist(), sorted(store.columns.timestamps.tolist())
+        )
+
+    async def test_retention(self):
+        store = FakeStore(make_rows(self.now - timedelta(days=40), 40))
+        self.assertFalse(store.covers(self.now - timedelta(days=31)))
+        self.assertTrue(store.covers(self.now - timedelta(days=29)))
+        await store.frame(self.now - timedelta(days=40), self.now)
+        self.assertGreaterEqual(store.loaded_from_ms, store.horizon_ms() - MS_PER_DAY)
+        self.assertLessEqual(store.columns.size, 31)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import gzip
+import tracemalloc
+import unittest
+import zlib
+
+import brotli
+from project.compression import RequestDecompressionMiddleware
+
+MAX_BODY_SIZE = 1 << 20
+
+
+def compress_zeros(encoding: str, size: int) -> bytes:
+    chunk = bytes(1 << 20)
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=1)
+        parts = [compressor.process(chunk) for _ in range(size // len(chunk))]
+        return b"".join(parts) + compressor.finish()
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    parts = [compressor.compress(chunk) for _ in range(size // len(chunk))]
+    return b"".join(parts) + compressor.flush()
+
+
+def post(encoding: str, body: bytes):
+    """
+    Sends body through the middleware to an app that reads it, returning the status and the
+    number of body bytes the app received.
+    """
+    received = []
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            received.append(len(message["body"]))
+            if not message.get("more_body", False):
+                break
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "headers": [(b"content-encoding", encoding.encode())],
+    }
+    middleware = RequestDecompressionMiddleware(app, max_body_size=MAX_BODY_SIZE)
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"], sum(received)
+
+
+class RequestDecompressionTest(unittest.TestCase):
+    def assert_rejected_within_memory_bound(self, encoding: str):
+        payload = compress_zeros(encoding, 512 << 20)
+        self.assertLess(len(payload), 1 << 20)
+        tracemalloc.start()
+        try:
+            status, _ = post(encoding, payload)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(status, 413)
+        self.assertLess(peak, 8 * MAX_BODY_SIZE)
+
+    def test_gzip_bomb_is_rejected_without_inflating(self):
+        self.assert_rejected_within_memory_bound("gzip")
+
+    def test_br_bomb_is_rejected_without_inflating(self):
+        self.assert_rejected_within_memory_bound("br")
+
+    def test_body_at_the_limit_is_accepted(self):
+        body = bytes(MAX_BODY_SIZE)
+        self.assertEqual(post("gzip", gzip.compress(body)), (200, MAX_BODY_SIZE))
+        self.assertEqual(post("br", brotli.compress(body)), (200, MAX_BODY_SIZE))
+
+    def test_truncated_body_is_rejected(self):
+        self.assertEqual(post("gzip", gzip.compress(b"x" * 1000)[:-8])[0], 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import random
+import time
+import unittest
+
+from project.live_engagement_service import (
+    LiveEngagementTracker,
+    SlidingWindowCounter,
+)
+
+WINDOWS = (10, 60, 300)
+
+
+class SlidingWindowCounterTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        for _ in range(20):
+            now = 1_000_000
+            counter = SlidingWindowCounter(WINDOWS, now)
+            events = []
+            for _ in range(300):
+                now += rng.choice((0, 0, 1, 1, 2, 9, 10, 11, 59, 61, 299, 301, 700))
+                count = rng.randint(1, 5)
+                counter.add(count, now=now)
+                events.append((now, count))
+                expected = {
+                    window: sum(c for second, c in events if second > now - window)
+                    for window in WINDOWS
+                }
+                self.assertEqual(counter.counts(now), expected)
+
+    def test_idle_counters_advance_in_constant_steps(self):
+        counters = [SlidingWindowCounter((60, 300, 3600), 0) for _ in range(10_000)]
+        for counter in counters:
+            counter.add(now=0)
+            counter.add(now=100)
+        started = time.perf_counter()
+        totals = [counter.counts(now=3480)[3600] for counter in counters]
+        self.assertLess(time.perf_counter() - started, 2.0)
+        self.assertEqual(set(totals), {2})
+
+
+class LiveEngagementTrackerTest(unittest.TestCase):
+    def test_snapshot_is_shared_and_truncated(self):
+        tracker = LiveEngagementTracker(WINDOWS, max_users=1000)
+        for user in range(50):
+            for _ in range(user):
+                tracker.record("NaturalLanguageProcessing", f"user-{user}")
+        top = tracker.snapshot(top_users=3)
+        self.assertEqual(list(top.users), ["user-49", "user-48", "user-47"])
+        self.assertEqual(len(tracker.snapshot(top_users=20).users), 20)
+        self.assertIs(tracker.snapshot(5).modules, top.modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from project.entity_recognition_service import pipeline_name
+from project.result_cache import MAX_TRACKED_MODELS, ResultCache
+from project.sentiment_analysis_service import SentimentAnalysisResponse
+
+
+class PipelineNameTest(unittest.TestCase):
+    def test_language_codes(self):
+        self.assertEqual(pipeline_name(None), "en_core_web_sm")
+        self.assertEqual(pipeline_name("de"), "de_core_news_sm")
+
+    def test_rejects_paths(self):
+        for language in ("../../site-packages/de", "de/..", "DE", "de_core"):
+            with self.assertRaises(ValueError):
+                pipeline_name(language)
+
+
+class ResultCacheDiskTest(unittest.TestCase):
+    def test_model_name_never_becomes_a_path(self):
+        with tempfile.TemporaryDirectory() as root:
+            victim = os.path.join(root, "victim", "model_files")
+            os.makedirs(victim)
+            cache = ResultCache("entities", 1 << 20, os.path.join(root, "cache"))
+            response = SentimentAnalysisResponse(sentiment="positive", confidence=1.0)
+
+            async def compute(version):
+                return await cache.get_or_compute(
+                    "../../victim",
+                    version,
+                    {},
+                    "text",
+                    lambda: response,
+                    type(response),
+                )
+
+            asyncio.run(compute("1"))
+            asyncio.run(compute("2"))
+            self.assertTrue(os.path.isdir(victim))
+            written = [
+                directory
+                for directory, _, files in os.walk(os.path.join(root, "cache"))
+                if files
+            ]
+            # Only the current version is kept, inside the cache directory.
+            self.assertEqual(len(written), 1)
+            self.assertTrue(
+                written[0].startswith(os.path.join(root, "cache", "entities"))
+            )
+
+    def test_tracked_versions_are_bounded(self):
+        cache = ResultCache("entities", 1 << 20)
+        for index in range(MAX_TRACKED_MODELS * 2):
+            cache._set_version(f"model-{index}", "1")
+        self.assertEqual(len(cache.versions), MAX_TRACKED_MODELS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from project.sketches import CountMinSketch, HyperLogLog
+
+
+class HyperLogLogTest(unittest.TestCase):
+    def test_merge_takes_register_maximum(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for index in range(2000):
+            first.add(f"a{index}")
+            second.add(f"b{index}")
+        expected = bytes(map(max, first.registers, second.registers))
+        first.merge(second)
+        self.assertEqual(first.to_bytes(), expected)
+        self.assertLess(abs(first.estimate() - 4000) / 4000, 4 * first.relative_error)
+
+
+class CountMinSketchTest(unittest.TestCase):
+    def test_merge_adds_counters(self):
+        first, second = CountMinSketch(), CountMinSketch()
+        first.add("x", 3)
+        second.add("x", 4)
+        second.add("y")
+        first.merge(second)
+        self.assertEqual(first.estimate("x"), 7)
+        self.assertEqual(first.total, 8)
+        restored = CountMinSketch(
+            first.width, first.depth, first.total, first.to_bytes()
+        )
+        self.assertEqual(restored.estimate("y"), first.estimate("y"))
+
+    def test_merge_rejects_overflow(self):
+        first, second = CountMinSketch(), CountMinSketch()
+        first.add("x", 2**32 - 1)
+        second.add("x")
+        with self.assertRaises(OverflowError):
+            first.merge(second)
+
+
+if __name__ == "__main__":
+    unittest.main()